@@ -0,0 +1,267 @@
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+from database.db_manager import DatabaseManager
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class StreamAborted(Exception):
+    """A streamed response failed after its headers were sent; the connection is dropped."""
+
+
+class LedgerServer:
+    """Headless JSON API over a DatabaseManager, for tools on the same machine.
+
+    Reads run on a pool of `readers` threads and writes on a single writer
+    thread. Only the number of threads is bounded: every DatabaseManager call
+    still opens and closes its own connection, so at most `readers` reads and
+    one write run at a time.
+
+    GET  /transactions?start=&end=&limit=&after_date=&after_id=   keyset pages
+    GET  /transactions.ndjson?start=&end=                         full export as NDJSON
+    GET  /summary                                                 balance and totals
+    GET  /search?q=&limit=
+    POST /transactions/bulk?on_duplicate=flag|skip|merge          JSON array or NDJSON rows
+    """
+
+    def __init__(self, db, host="127.0.0.1", port=8765, readers=4,
+                 max_page=1000, max_body=64 * 1024 * 1024):
+        self.db = db
+        self.host = host
+        self.port = port
+        self.max_page = max_page
+        self.max_body = max_body
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="ledger-reader")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ledger-writer")
+        self._server = None
+        self._handlers = set()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        # Port 0 picks a free port; report the real one
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+        # Requests still in flight could not schedule work once the
+        # executors are shut down, so drop their connections first.
+        # A write already running on the writer thread still completes.
+        for task in list(self._handlers):
+            task.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._readers.shutdown)
+        await loop.run_in_executor(None, self._writer.shutdown)
+
+    async def _read(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._readers, func, *args)
+
+    async def _write(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._writer, func, *args)
+
+    # --- HTTP plumbing ---
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            try:
+                method, target, _ = request_line.decode("latin-1").split()
+            except ValueError:
+                raise HTTPError(400, "Malformed request line")
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length", 0))
+            if length > self.max_body:
+                raise HTTPError(413, "Request body too large")
+            body = await reader.readexactly(length) if length else b""
+
+            url = urlsplit(target)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            await self._dispatch(writer, method, url.path, query, headers, body)
+        except HTTPError as e:
+            await self._send_json(writer, {"error": str(e)}, e.status)
+        except ValueError as e:
+            await self._send_json(writer, {"error": str(e)}, 400)
+        except (ConnectionError, asyncio.IncompleteReadError, StreamAborted):
+            pass
+        except Exception as e:
+            await self._send_json(writer, {"error": f"Internal error: {e}"}, 500)
+        except asyncio.CancelledError:
+            # Shutting down: don't wait to flush a client that stopped reading
+            writer.transport.abort()
+            raise
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+            finally:
+                self._handlers.discard(task)
+
+    async def _send_head(self, writer, status, content_type, extra):
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                f"Content-Type: {content_type}", "Connection: close"] + extra
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+
+    async def _send_json(self, writer, payload, status=200):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        await self._send_head(writer, status, "application/json; charset=utf-8",
+                              [f"Content-Length: {len(data)}"])
+        writer.write(data)
+        await writer.drain()
+
+    async def _dispatch(self, writer, method, path, query, headers, body):
+        routes = {
+            "/transactions": ("GET", self._transactions),
+            "/transactions.ndjson": ("GET", self._transactions_ndjson),
+            "/summary": ("GET", self._summary),
+            "/search": ("GET", self._search),
+            "/transactions/bulk": ("POST", self._bulk_insert),
+        }
+        if path not in routes:
+            raise HTTPError(404, f"Unknown path: {path}")
+        allowed, handler = routes[path]
+        if method != allowed:
+            raise HTTPError(405, f"Use {allowed} for {path}")
+        await handler(writer, query, headers, body)
+
+    def _limit(self, query, default=100):
+        limit = int(query.get("limit", default))
+        if not 0 < limit <= self.max_page:
+            raise ValueError(f"limit must be between 1 and {self.max_page}")
+        return limit
+
+    # --- Endpoints ---
+
+    async def _transactions(self, writer, query, headers, body):
+        limit = self._limit(query)
+        after = None
+        if "after_date" in query and "after_id" in query:
+            after = (query["after_date"], int(query["after_id"]))
+        rows = await self._read(self.db.get_transactions_page,
+                                query.get("start"), query.get("end"), after, limit)
+        next_page = None
+        if len(rows) == limit:
+            next_page = {"after_date": rows[-1].date, "after_id": rows[-1].id}
+        await self._send_json(writer, {"items": [r.to_dict() for r in rows], "next": next_page})
+
+    async def _transactions_ndjson(self, writer, query, headers, body):
+        await self._send_head(writer, 200, "application/x-ndjson; charset=utf-8",
+                              ["Transfer-Encoding: chunked"])
+        start, end, after = query.get("start"), query.get("end"), None
+        while True:
+            # A reader thread is held only while one page is read, never
+            # while waiting for a slow client to take the previous one
+            try:
+                rows = await self._read(self.db.get_transactions_page, start, end, after, 1000)
+            except Exception as e:
+                # The status line is already sent; leaving the chunked body
+                # unterminated tells the client the export is incomplete
+                writer.transport.abort()
+                raise StreamAborted(str(e)) from e
+            if rows:
+                chunk = "".join(json.dumps(r.to_dict(), ensure_ascii=False) + "\n" for r in rows)
+                data = chunk.encode("utf-8")
+                writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+                await writer.drain()
+            if len(rows) < 1000:
+                break
+            after = (rows[-1].date, rows[-1].id)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _summary(self, writer, query, headers, body):
+        balance, income, expense = await self._read(self.db.get_balance)
+        by_income = await self._read(self.db.get_summary_by_category, "Income")
+        by_expense = await self._read(self.db.get_summary_by_category, "Expense")
+        monthly = await self._read(self.db.get_monthly_summary)
+        await self._send_json(writer, {
+            "balance": balance,
+            "income": income,
+            "expense": expense,
+            "by_category": {"Income": dict(by_income), "Expense": dict(by_expense)},
+            "monthly": monthly,
+        })
+
+    async def _search(self, writer, query, headers, body):
+        text = query.get("q", "").strip()
+        if not text:
+            raise ValueError("q is required")
+        rows = await self._read(self.db.search_transactions, text, self._limit(query))
+        await self._send_json(writer, {"items": [r.to_dict() for r in rows]})
+
+    async def _bulk_insert(self, writer, query, headers, body):
+        text = body.decode("utf-8")
+        if "ndjson" in headers.get("content-type", ""):
+            items = [json.loads(line) for line in text.splitlines() if line.strip()]
+        else:
+            items = json.loads(text or "[]")
+        if not isinstance(items, list):
+            raise ValueError("Expected a list of transactions")
+        try:
+            rows = [(i["date"], i["type"], i["category"], float(i["amount"]), i.get("description", ""))
+                    for i in items]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid transaction: {e}")
+        inserted = await self._write(self.db.add_transactions, rows,
+                                     query.get("on_duplicate", "flag"))
+        await self._send_json(writer, {"received": len(rows), "inserted": inserted})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local JSON API over the finance ledger")
+    parser.add_argument("--db", default="finance.db", help="database file")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--readers", type=int, default=4, help="size of the reader pool")
+    args = parser.parse_args(argv)
+
+    server = LedgerServer(DatabaseManager(args.db), args.host, args.port, args.readers)
+
+    async def run():
+        await server.start()
+        print(f"Serving {args.db} on http://{server.host}:{server.port}", file=sys.stderr)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import argparse
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+
+from .db_manager import DatabaseManager
+
+SNAPSHOT_SUFFIX = ".db.gz"
+CHECKSUM_SUFFIX = ".sha256"
+
+
+class SnapshotAborted(Exception):
+    """Raised when stop() interrupts a snapshot in progress."""
+
+
+def file_checksum(path, chunk_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BackupService:
+    """Online backups of a DatabaseManager's database.
+
+    Snapshots are taken with the SQLite backup API in small page steps with a
+    pause between them, so the application keeps reading and writing while a
+    backup runs. Each snapshot is gzip-compressed, stored next to a SHA-256
+    checksum file, and only the newest `keep` snapshots are retained.
+    stop() also aborts a snapshot in progress, so quitting the application
+    does not wait for a large ledger to finish copying.
+    """
+
+    def __init__(self, db, backup_dir=None, interval=3600.0, keep=7, pages=256, sleep=0.01):
+        self.db = db
+        if backup_dir is None:
+            backup_dir = os.path.join(os.path.dirname(os.path.abspath(db.db_name)), "backups")
+        self.backup_dir = backup_dir
+        self.interval = interval
+        self.keep = keep
+        self.pages = pages
+        self.sleep = sleep
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _snapshot_prefix(self):
+        return os.path.splitext(os.path.basename(self.db.db_name))[0] + "-"
+
+    def _check_stop(self, *args):
+        if self._stop.is_set():
+            raise SnapshotAborted("Backup service is stopping")
+
+    def create_snapshot(self):
+        """Take a consistent snapshot and return the path of the compressed file.
+
+        Raises SnapshotAborted if stop() is called meanwhile; no partial
+        files are left behind.
+        """
+        os.makedirs(self.backup_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        path = os.path.join(self.backup_dir, self._snapshot_prefix() + stamp + SNAPSHOT_SUFFIX)
+
+        with self._lock:
+            fd, raw_path = tempfile.mkstemp(suffix=".db", dir=self.backup_dir)
+            os.close(fd)
+            partial = path + ".part"
+            try:
+                source = self.db.get_connection()
+                target = sqlite3.connect(raw_path)
+                try:
+                    # The progress callback runs after every step of `pages`
+                    source.backup(target, pages=self.pages, progress=self._check_stop, sleep=self.sleep)
+                    result = target.execute("PRAGMA quick_check").fetchone()[0]
+                finally:
+                    target.close()
+                    source.close()
+                if result != "ok":
+                    raise sqlite3.DatabaseError(f"Snapshot failed integrity check: {result}")
+
+                with open(raw_path, "rb") as src, gzip.open(partial, "wb") as dst:
+                    for chunk in iter(lambda: src.read(1024 * 1024), b""):
+                        self._check_stop()
+                        dst.write(chunk)
+                checksum = file_checksum(partial)
+                os.replace(partial, path)
+                with open(path + CHECKSUM_SUFFIX, "w") as f:
+                    f.write(f"{checksum}  {os.path.basename(path)}\n")
+            finally:
+                for leftover in (raw_path, partial):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+
+            self.rotate()
+        return path
+
+    def list_snapshots(self):
+        """Return snapshot paths, newest first."""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        prefix = self._snapshot_prefix()
+        names = [n for n in os.listdir(self.backup_dir)
+                 if n.startswith(prefix) and n.endswith(SNAPSHOT_SUFFIX)]
+        return [os.path.join(self.backup_dir, n) for n in sorted(names, reverse=True)]
+
+    def rotate(self):
+        """Delete all but the newest `keep` snapshots."""
+        for path in self.list_snapshots()[self.keep:]:
+            os.remove(path)
+            if os.path.exists(path + CHECKSUM_SUFFIX):
+                os.remove(path + CHECKSUM_SUFFIX)
+
+    def verify(self, path):
+        """Check a snapshot against its stored checksum."""
+        try:
+            with open(path + CHECKSUM_SUFFIX) as f:
+                expected = f.read().split()[0]
+        except (OSError, IndexError):
+            return False
+        return os.path.exists(path) and file_checksum(path) == expected
+
+    def restore(self, path):
+        """Replace the database contents with a verified snapshot."""
+        if not self.verify(path):
+            raise ValueError(f"Snapshot checksum mismatch: {path}")
+
+        os.makedirs(self.backup_dir, exist_ok=True)
+        with self._lock:
+            fd, raw_path = tempfile.mkstemp(suffix=".db", dir=self.backup_dir)
+            os.close(fd)
+            try:
+                with gzip.open(path, "rb") as src, open(raw_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+                source = sqlite3.connect(raw_path)
+                try:
+                    self.db.restore_from(source, pages=self.pages, sleep=self.sleep)
+                finally:
+                    source.close()
+            finally:
+                os.remove(raw_path)
+
+    def start(self):
+        """Start taking snapshots every `interval` seconds in a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="BackupService", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the background thread, aborting a snapshot in progress."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.create_snapshot()
+                self.last_error = None
+            except SnapshotAborted:
+                return
+            except Exception as e:
+                self.last_error = e
+                print(f"Backup failed: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Finance database backups")
+    parser.add_argument("--db", default="finance.db", help="database file")
+    parser.add_argument("--dir", default=None, help="backup directory (default: <db dir>/backups)")
+    parser.add_argument("--keep", type=int, default=7, help="number of snapshots to keep")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("create", help="take a snapshot now")
+    commands.add_parser("list", help="list snapshots, newest first")
+    verify_cmd = commands.add_parser("verify", help="check a snapshot checksum")
+    verify_cmd.add_argument("snapshot")
+    restore_cmd = commands.add_parser("restore", help="restore the database from a snapshot")
+    restore_cmd.add_argument("snapshot")
+    args = parser.parse_args(argv)
+
+    service = BackupService(DatabaseManager(args.db), args.dir, keep=args.keep)
+    if args.command == "create":
+        print(service.create_snapshot())
+    elif args.command == "list":
+        for path in service.list_snapshots():
+            status = "ok" if service.verify(path) else "CORRUPT"
+            print(f"{path}\t{status}")
+    elif args.command == "verify":
+        ok = service.verify(args.snapshot)
+        print("ok" if ok else "checksum mismatch")
+        return 0 if ok else 1
+    elif args.command == "restore":
+        service.restore(args.snapshot)
+        print(f"Restored {args.db} from {args.snapshot}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+TRANSACTION_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("date", pa.date32()),
+    ("type", pa.dictionary(pa.int32(), pa.string())),
+    ("category", pa.dictionary(pa.int32(), pa.string())),
+    ("amount", pa.float64()),
+    ("description", pa.string()),
+])
+
+# The Arrow IPC file format (.arrow, Feather v2) allows only one dictionary
+# per column for the whole file, so batches written there use plain strings.
+PLAIN_SCHEMA = pa.schema([
+    pa.field(f.name, f.type.value_type) if pa.types.is_dictionary(f.type) else f
+    for f in TRANSACTION_SCHEMA
+])
+
+# "arrow" is the IPC file format, "arrows" the IPC stream format
+FORMATS = ("parquet", "arrow", "arrows")
+
+
+def detect_format(path):
+    """Guess the columnar format from the file extension."""
+    lowered = path.lower()
+    if lowered.endswith(".arrows"):
+        return "arrows"
+    if lowered.endswith((".arrow", ".feather", ".ipc")):
+        return "arrow"
+    return "parquet"
+
+
+def rows_to_batch(rows, dictionary=True):
+    """Convert Transaction records to a typed record batch."""
+    def strings(values):
+        array = pa.array(values, pa.string())
+        return array.dictionary_encode() if dictionary else array
+
+    return pa.record_batch([
+        pa.array([r.id for r in rows], pa.int64()),
+        pa.array([r.date for r in rows], pa.string()).cast(pa.date32()),
+        strings([r.type for r in rows]),
+        strings([r.category for r in rows]),
+        pa.array([r.amount for r in rows], pa.float64()),
+        pa.array([r.description for r in rows], pa.string()),
+    ], schema=TRANSACTION_SCHEMA if dictionary else PLAIN_SCHEMA)
+
+
+def batch_to_rows(batch):
+    """Convert a record batch back to (date, type, category, amount, description) rows."""
+    # Casting to plain strings in Arrow is much cheaper than converting
+    # date and dictionary values one Python object at a time
+    columns = []
+    for name in ("date", "type", "category", "amount", "description"):
+        column = batch.column(name)
+        if name != "amount":
+            column = column.cast(pa.string())
+        columns.append(column.to_pylist())
+    return zip(*columns)
+
+
+def export_transactions(db, path, fmt=None, batch_size=65536, start_date=None, end_date=None):
+    """Stream transactions from `db` to a Parquet, Arrow IPC file or Arrow IPC stream.
+
+    Returns the row count.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+
+    options = ipc.IpcWriteOptions(compression="zstd")
+    dictionary = fmt != "arrow"
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(path, TRANSACTION_SCHEMA, compression="zstd")
+    elif fmt == "arrow":
+        writer = ipc.new_file(path, PLAIN_SCHEMA, options=options)
+    else:
+        # The stream format allows each batch to carry its own dictionaries
+        writer = ipc.new_stream(path, TRANSACTION_SCHEMA, options=options)
+
+    count = 0
+    try:
+        for rows in db.iter_transaction_batches(start_date, end_date, batch_size):
+            writer.write_batch(rows_to_batch(rows, dictionary))
+            count += len(rows)
+    finally:
+        writer.close()
+    return count
+
+
+def iter_batches(path, fmt=None, batch_size=65536):
+    """Yield record batches from a Parquet file or an Arrow IPC file or stream."""
+    fmt = fmt or detect_format(path)
+    if fmt == "parquet":
+        columns = ["date", "type", "category", "amount", "description"]
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns)
+    elif fmt == "arrow":
+        with pa.memory_map(path) as source:
+            reader = ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i)
+    elif fmt == "arrows":
+        with pa.memory_map(path) as source:
+            yield from ipc.open_stream(source)
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+
+
+def import_transactions(db, path, fmt=None, batch_size=65536, on_duplicate="skip"):
+    """Load transactions from a columnar file through the bulk insert path.
+
+    Rows already in the ledger are skipped by default, so re-importing an
+    overlapping export is safe. Returns the number of inserted rows.
+    """
+    count = 0
+    for batch in iter_batches(path, fmt, batch_size):
+        count += db.add_transactions(batch_to_rows(batch), on_duplicate)
+    return count
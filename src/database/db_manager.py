@@ -1,15 +1,168 @@
 import sqlite3
 from datetime import datetime
+import atexit
+import hashlib
 import os
+import threading
+
+from .models import Transaction
+
+TRANSACTION_COLUMNS = "id, date, type, category, amount, description"
+DUPLICATE_MODES = ("flag", "skip", "merge")
+# PRAGMA user_version from which category_spending is known to be backfilled
+SPENDING_SCHEMA_VERSION = 1
+# PRAGMA user_version from which every stored date is zero-padded YYYY-MM-DD
+CANONICAL_DATES_SCHEMA_VERSION = 2
+
+
+def transaction_fingerprint(date, type_, category, amount, description):
+    """Stable hash identifying a transaction for import deduplication.
+
+    The description is compared case-insensitively with whitespace collapsed,
+    so the same bank statement line exported twice still matches.
+    """
+    normalized = " ".join((description or "").split()).casefold()
+    key = "\x1f".join((date, type_, category, f"{float(amount):.2f}", normalized))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class _WorkingCopyConnection:
+    """Connection handle for the in-memory working copy.
+
+    All callers share one `:memory:` connection, so `close()` must not close it.
+    `commit()` marks the working copy dirty so the next flush writes it to disk.
+    """
+
+    def __init__(self, manager):
+        self._manager = manager
+        self._conn = manager._memory_conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        result = self._conn.__exit__(exc_type, exc, tb)
+        if exc_type is None:
+            self._manager._dirty = True
+        return result
+
+    def commit(self):
+        self._conn.commit()
+        self._manager._dirty = True
+
+    def close(self):
+        pass
+
 
 class DatabaseManager:
-    def __init__(self, db_name="finance.db"):
+    def __init__(self, db_name="finance.db", in_memory=False, flush_interval=30.0,
+                 flush_pages=64, flush_sleep=0.005):
+        """
+        in_memory: load `db_name` into a `:memory:` working copy and run all
+        queries there. Changes are written back with page-stepped backups every
+        `flush_interval` seconds (None disables the timer) and on `close()`/exit.
+        """
         self.db_name = db_name
+        self.in_memory = in_memory
+        self.flush_interval = flush_interval
+        self.flush_pages = flush_pages
+        self.flush_sleep = flush_sleep
+        self._memory_conn = None
+        self._flush_lock = threading.Lock()
+        self._flush_timer = None
+        self._dirty = False
+
+        if in_memory:
+            self._load_working_copy()
         self.init_db()
+        if in_memory:
+            self._schedule_flush()
+            atexit.register(self.close)
 
     def get_connection(self):
+        if self.in_memory:
+            return _WorkingCopyConnection(self)
         return sqlite3.connect(self.db_name)
 
+    def _load_working_copy(self):
+        """Copy the on-disk database into a private in-memory database."""
+        # The flush timer writes from its own thread, hence check_same_thread
+        self._memory_conn = sqlite3.connect(":memory:", check_same_thread=False)
+        disk = sqlite3.connect(self.db_name)
+        try:
+            disk.backup(self._memory_conn)
+        finally:
+            disk.close()
+
+    def _schedule_flush(self):
+        if not self.flush_interval:
+            return
+        self._flush_timer = threading.Timer(self.flush_interval, self._flush_tick)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def _flush_tick(self):
+        try:
+            self.flush()
+        finally:
+            if self._memory_conn is not None:
+                self._schedule_flush()
+
+    def flush(self):
+        """Write the in-memory working copy back to disk.
+
+        The copy runs in steps of `flush_pages` pages with `flush_sleep` seconds
+        between them, so writers on the working copy are never blocked for long.
+        Returns True if anything was written.
+        """
+        if not self.in_memory or self._memory_conn is None:
+            return False
+        with self._flush_lock:
+            if not self._dirty:
+                return False
+            # Changes made through the same connection while the backup is
+            # running are applied to the destination by SQLite itself.
+            self._dirty = False
+            disk = sqlite3.connect(self.db_name)
+            try:
+                self._memory_conn.backup(disk, pages=self.flush_pages, sleep=self.flush_sleep)
+            except Exception:
+                self._dirty = True
+                raise
+            finally:
+                disk.close()
+            return True
+
+    def restore_from(self, source, pages=-1, sleep=0.25):
+        """Replace the database contents with those of another sqlite3 connection."""
+        if self.in_memory:
+            source.backup(self._memory_conn, pages=pages, sleep=sleep)
+            self._dirty = True
+            self.init_db()
+            return
+        target = sqlite3.connect(self.db_name)
+        try:
+            source.backup(target, pages=pages, sleep=sleep)
+        finally:
+            target.close()
+        # Snapshots taken by older versions may lack newer tables and columns
+        self.init_db()
+
+    def close(self):
+        """Stop the flush timer, write pending changes and release the working copy."""
+        if not self.in_memory or self._memory_conn is None:
+            return
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+        self.flush()
+        self._memory_conn.close()
+        self._memory_conn = None
+        atexit.unregister(self.close)
+
     def init_db(self):
         """Initialize the database and create tables if they don't exist."""
         conn = self.get_connection()
@@ -22,38 +175,238 @@ class DatabaseManager:
                 type TEXT NOT NULL,
                 category TEXT NOT NULL,
                 amount REAL NOT NULL,
-                description TEXT
+                description TEXT,
+                fingerprint TEXT,
+                duplicate_of INTEGER
             )
         ''')
-        
+        cursor.execute("PRAGMA table_info(transactions)")
+        if "fingerprint" not in {row[1] for row in cursor.fetchall()}:
+            self._add_fingerprints(cursor)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date, id)")
+
+        # Only one row per fingerprint is an "original"; rows inserted in
+        # flag mode point at it through duplicate_of.
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_fingerprint
+            ON transactions (fingerprint) WHERE duplicate_of IS NULL
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_transactions_duplicates
+            ON transactions (duplicate_of) WHERE duplicate_of IS NOT NULL
+        ''')
+
+        # Closing balance at the end of each month, used as the starting point
+        # for running balances. Any change to a month invalidates it and every
+        # later checkpoint; they are rebuilt lazily by _ensure_checkpoints().
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS balance_checkpoints (
+                month TEXT PRIMARY KEY,
+                balance REAL NOT NULL
+            )
+        ''')
+        cursor.executescript('''
+            CREATE TRIGGER IF NOT EXISTS trg_checkpoints_insert AFTER INSERT ON transactions
+            BEGIN
+                DELETE FROM balance_checkpoints WHERE month >= strftime('%Y-%m', NEW.date);
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_checkpoints_delete AFTER DELETE ON transactions
+            BEGIN
+                DELETE FROM balance_checkpoints WHERE month >= strftime('%Y-%m', OLD.date);
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_checkpoints_update
+            AFTER UPDATE OF date, type, amount ON transactions
+            BEGIN
+                DELETE FROM balance_checkpoints
+                WHERE month >= min(strftime('%Y-%m', OLD.date), strftime('%Y-%m', NEW.date));
+            END;
+        ''')
+
+        # Monthly spending limits per category. Spent-to-date is kept per
+        # (category, month) by triggers, so checking a budget after a write
+        # is a primary key lookup instead of a GROUP BY over the ledger.
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS budgets (
+                category TEXT NOT NULL,
+                period TEXT NOT NULL,
+                limit_amount REAL NOT NULL,
+                PRIMARY KEY (category, period)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS category_spending (
+                category TEXT NOT NULL,
+                period TEXT NOT NULL,
+                spent REAL NOT NULL,
+                PRIMARY KEY (category, period)
+            )
+        ''')
+        # user_version records which one-time migrations ran, so ledgers
+        # without expenses are not rescanned on every start
+        cursor.execute("PRAGMA user_version")
+        version = cursor.fetchone()[0]
+        if version < CANONICAL_DATES_SCHEMA_VERSION:
+            # Must run first: the backfill groups by strftime() of the date
+            self._canonicalize_dates(cursor)
+        if version < SPENDING_SCHEMA_VERSION:
+            cursor.execute("SELECT 1 FROM category_spending LIMIT 1")
+            if cursor.fetchone() is None:
+                cursor.execute('''
+                    INSERT INTO category_spending (category, period, spent)
+                    SELECT category, strftime('%Y-%m', date), SUM(amount)
+                    FROM transactions
+                    WHERE type = 'Expense'
+                    GROUP BY 1, 2
+                ''')
+        if version < CANONICAL_DATES_SCHEMA_VERSION:
+            cursor.execute(f"PRAGMA user_version = {CANONICAL_DATES_SCHEMA_VERSION}")
+        cursor.executescript('''
+            CREATE TRIGGER IF NOT EXISTS trg_spending_insert AFTER INSERT ON transactions
+            WHEN NEW.type = 'Expense'
+            BEGIN
+                INSERT INTO category_spending (category, period, spent)
+                VALUES (NEW.category, strftime('%Y-%m', NEW.date), NEW.amount)
+                ON CONFLICT (category, period) DO UPDATE SET spent = spent + excluded.spent;
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_spending_delete AFTER DELETE ON transactions
+            WHEN OLD.type = 'Expense'
+            BEGIN
+                UPDATE category_spending SET spent = spent - OLD.amount
+                WHERE category = OLD.category AND period = strftime('%Y-%m', OLD.date);
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_spending_update
+            AFTER UPDATE OF date, type, category, amount ON transactions
+            BEGIN
+                UPDATE category_spending SET spent = spent - OLD.amount
+                WHERE OLD.type = 'Expense'
+                  AND category = OLD.category AND period = strftime('%Y-%m', OLD.date);
+                INSERT INTO category_spending (category, period, spent)
+                SELECT NEW.category, strftime('%Y-%m', NEW.date), NEW.amount
+                WHERE NEW.type = 'Expense'
+                ON CONFLICT (category, period) DO UPDATE SET spent = spent + excluded.spent;
+            END;
+        ''')
+
         conn.commit()
         conn.close()
 
-    def add_transaction(self, date, type_, category, amount, description=""):
-        """Add a new transaction."""
+    @staticmethod
+    def _add_fingerprints(cursor):
+        """Add the dedup columns to a ledger created before they existed."""
+        cursor.execute("ALTER TABLE transactions ADD COLUMN fingerprint TEXT")
+        cursor.execute("ALTER TABLE transactions ADD COLUMN duplicate_of INTEGER")
+        cursor.execute(f"SELECT {TRANSACTION_COLUMNS} FROM transactions ORDER BY id")
+        originals = {}
+        updates = []
+        for t_id, date, type_, category, amount, description in cursor.fetchall():
+            fp = transaction_fingerprint(date, type_, category, amount, description)
+            original = originals.get(fp)
+            if original is None:
+                originals[fp] = t_id
+            updates.append((fp, original, t_id))
+        cursor.executemany("UPDATE transactions SET fingerprint = ?, duplicate_of = ? WHERE id = ?", updates)
+
+    @staticmethod
+    def _canonicalize_dates(cursor):
+        """Rewrite dates stored without zero padding (2023-1-5) as YYYY-MM-DD.
+
+        Older versions accepted them, but SQLite's date functions return NULL
+        for them, which breaks the spending and checkpoint triggers.
+        """
+        cursor.execute(f'''
+            SELECT {TRANSACTION_COLUMNS}, duplicate_of FROM transactions
+            WHERE date NOT GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'
+            ORDER BY id
+        ''')
+        rows = cursor.fetchall()
+        for t_id, date, type_, category, amount, description, duplicate_of in rows:
+            try:
+                date = datetime.strptime(date, "%Y-%m-%d").strftime("%Y-%m-%d")
+            except ValueError:
+                continue
+            fp = transaction_fingerprint(date, type_, category, amount, description)
+            if duplicate_of is None:
+                # The padded form may already be stored as another original;
+                # this row and its duplicates then become duplicates of it
+                cursor.execute("SELECT id FROM transactions WHERE fingerprint = ? AND duplicate_of IS NULL",
+                               (fp,))
+                existing = cursor.fetchone()
+                if existing:
+                    cursor.execute("UPDATE transactions SET duplicate_of = ? WHERE id = ? OR duplicate_of = ?",
+                                   (existing[0], t_id, t_id))
+            cursor.execute("UPDATE transactions SET date = ?, fingerprint = ? WHERE id = ?", (date, fp, t_id))
+        if rows:
+            cursor.execute("DELETE FROM balance_checkpoints")
+
+    @staticmethod
+    def _promote_duplicates(cursor, original_id):
+        """Make the oldest duplicate of a removed or changed original the new original."""
+        cursor.execute("SELECT MIN(id) FROM transactions WHERE duplicate_of = ?", (original_id,))
+        new_id = cursor.fetchone()[0]
+        if new_id is None:
+            return
+        cursor.execute("UPDATE transactions SET duplicate_of = NULL WHERE id = ?", (new_id,))
+        cursor.execute("UPDATE transactions SET duplicate_of = ? WHERE duplicate_of = ?", (new_id, original_id))
+
+    @staticmethod
+    def _validate(date, amount, now=None):
         if amount <= 0:
             raise ValueError("Amount must be greater than 0")
-        
-        # Validate date is not in future
+
+        # strptime also accepts 2023-1-5, which SQLite's date functions don't
         trans_date = datetime.strptime(date, "%Y-%m-%d")
-        if trans_date > datetime.now():
+        if trans_date.strftime("%Y-%m-%d") != date:
+            raise ValueError(f"Date must be in YYYY-MM-DD format: {date}")
+
+        # Validate date is not in future
+        if trans_date > (now or datetime.now()):
             raise ValueError("Date cannot be in the future")
 
+    def add_transaction(self, date, type_, category, amount, description="", on_duplicate="flag"):
+        """Add a new transaction and return its ID.
+
+        on_duplicate decides what happens if an identical transaction exists:
+        "flag" inserts it marked as a duplicate, "skip" keeps only the existing
+        row and "merge" updates the existing row's description. For "skip" and
+        "merge" the existing row's ID is returned.
+        """
+        self._validate(date, amount)
+        if on_duplicate not in DUPLICATE_MODES:
+            raise ValueError(f"Unknown duplicate mode: {on_duplicate}")
+        fp = transaction_fingerprint(date, type_, category, amount, description)
+
         conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO transactions (date, type, category, amount, description)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (date, type_, category, amount, description))
-        conn.commit()
-        conn.close()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM transactions WHERE fingerprint = ? AND duplicate_of IS NULL", (fp,))
+            existing = cursor.fetchone()
+            if existing and on_duplicate == "skip":
+                return existing[0]
+            if existing and on_duplicate == "merge":
+                cursor.execute("UPDATE transactions SET description = ? WHERE id = ?", (description, existing[0]))
+                conn.commit()
+                return existing[0]
+
+            cursor.execute('''
+                INSERT INTO transactions (date, type, category, amount, description, fingerprint, duplicate_of)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (date, type_, category, amount, description, fp, existing[0] if existing else None))
+            t_id = cursor.lastrowid
+            conn.commit()
+            return t_id
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
 
     def get_transactions(self, start_date=None, end_date=None):
-        """Retrieve transactions with optional date filtering."""
+        """Retrieve transactions (Transaction records) with optional date filtering."""
         conn = self.get_connection()
         cursor = conn.cursor()
+        cursor.row_factory = Transaction.row_factory
         
-        query = "SELECT * FROM transactions"
+        query = f"SELECT {TRANSACTION_COLUMNS} FROM transactions"
         params = []
         
         if start_date and end_date:
@@ -67,32 +420,298 @@ class DatabaseManager:
         conn.close()
         return rows
 
-    def delete_transaction(self, transaction_id):
-        """Delete a transaction by ID."""
+    def get_transactions_page(self, start_date=None, end_date=None, after=None, limit=100):
+        """Retrieve one page of transactions, newest first, using keyset pagination.
+
+        after: (date, id) of the last row of the previous page. Each page is a
+        single range scan of the (date, id) index, however deep it is.
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
-        conn.commit()
+        cursor.row_factory = Transaction.row_factory
+
+        query = f"SELECT {TRANSACTION_COLUMNS} FROM transactions WHERE 1 = 1"
+        params = []
+
+        if start_date and end_date:
+            query += " AND date BETWEEN ? AND ?"
+            params += [start_date, end_date]
+        if after:
+            query += " AND (date, id) < (?, ?)"
+            params += list(after)
+
+        query += " ORDER BY date DESC, id DESC LIMIT ?"
+        params.append(limit)
+
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        conn.close()
+        return rows
+
+    def search_transactions(self, text, limit=100):
+        """Find transactions whose category or description contains `text`, newest first."""
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = Transaction.row_factory
+        cursor.execute(f'''
+            SELECT {TRANSACTION_COLUMNS} FROM transactions
+            WHERE category LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\'
+            ORDER BY date DESC, id DESC
+            LIMIT ?
+        ''', (pattern, pattern, limit))
+        rows = cursor.fetchall()
         conn.close()
+        return rows
+
+    def _ensure_checkpoints(self, cursor, month):
+        """Make sure every month before `month` has a checkpoint and return the opening balance of `month`."""
+        cursor.execute("SELECT month, balance FROM balance_checkpoints ORDER BY month DESC LIMIT 1")
+        last = cursor.fetchone()
+        last_month, balance = last if last else ("", 0.0)
+        if last_month >= month:
+            cursor.execute('''
+                SELECT balance FROM balance_checkpoints
+                WHERE month < ? ORDER BY month DESC LIMIT 1
+            ''', (month,))
+            row = cursor.fetchone()
+            return row[0] if row else 0.0
+
+        # Checkpoints always cover a prefix of the history, so only the months
+        # after the newest one need to be summed.
+        cursor.execute('''
+            SELECT strftime('%Y-%m', date) AS m,
+                   SUM(CASE type WHEN 'Income' THEN amount WHEN 'Expense' THEN -amount ELSE 0 END)
+            FROM transactions
+            WHERE date >= ? AND date < ?
+            GROUP BY m
+            ORDER BY m
+        ''', (self._next_month(last_month) if last_month else "", month))
+        checkpoints = []
+        for m, delta in cursor.fetchall():
+            balance += delta
+            checkpoints.append((m, balance))
+        if checkpoints:
+            cursor.executemany("INSERT INTO balance_checkpoints (month, balance) VALUES (?, ?)", checkpoints)
+        return balance
+
+    @staticmethod
+    def _next_month(month):
+        year, mon = map(int, month.split("-"))
+        return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+
+    def get_transactions_with_balance(self, start_date=None, end_date=None, limit=None, after=None):
+        """Retrieve transactions with the account balance after each row.
+
+        Rows are Transaction records with `balance` set, newest first. With
+        `limit` only one page is returned; `after` is the (date, id) of the
+        last row of the previous page. A page costs the page plus the rows
+        from the start of its oldest month: earlier history comes from the
+        monthly balance checkpoints.
+        """
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+
+            query = "SELECT date, id FROM transactions WHERE 1 = 1"
+            params = []
+
+            if start_date and end_date:
+                query += " AND date BETWEEN ? AND ?"
+                params += [start_date, end_date]
+            if after:
+                query += " AND (date, id) < (?, ?)"
+                params += list(after)
+
+            query += " ORDER BY date DESC, id DESC LIMIT ?"
+            params.append(-1 if limit is None else limit)
+
+            cursor.execute(query, params)
+            keys = cursor.fetchall()
+            if not keys:
+                return []
+            top, bottom = keys[0], keys[-1]
+
+            month = bottom[0][:7]
+            opening = self._ensure_checkpoints(cursor, month)
+            # Only commit when checkpoints were written, so a plain read does not
+            # mark the in-memory working copy dirty
+            if conn.in_transaction:
+                conn.commit()
+
+            cursor.row_factory = Transaction.row_factory
+            cursor.execute('''
+                SELECT * FROM (
+                    SELECT id, date, type, category, amount, description,
+                           ? + SUM(CASE type WHEN 'Income' THEN amount WHEN 'Expense' THEN -amount ELSE 0 END)
+                               OVER (ORDER BY date, id ROWS UNBOUNDED PRECEDING) AS balance
+                    FROM transactions
+                    WHERE date >= ? AND (date, id) <= (?, ?)
+                )
+                WHERE (date, id) >= (?, ?)
+                ORDER BY date DESC, id DESC
+            ''', (opening, month, top[0], top[1], bottom[0], bottom[1]))
+            rows = cursor.fetchall()
+            return rows
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def iter_transaction_batches(self, start_date=None, end_date=None, batch_size=10000):
+        """Yield transactions in lists of up to `batch_size` rows, newest first.
+
+        Each batch is a separate keyset page read in its own short transaction,
+        so a slow consumer never holds a read lock that would block writers.
+        Rows written between batches may or may not be included.
+        """
+        after = None
+        while True:
+            rows = self.get_transactions_page(start_date, end_date, after, batch_size)
+            if not rows:
+                return
+            yield rows
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1].date, rows[-1].id)
+
+    def add_transactions(self, rows, on_duplicate="flag"):
+        """Insert many transactions in one transaction.
+
+        rows: iterable of (date, type, category, amount, description) tuples.
+        All rows are validated; if any is invalid nothing is inserted.
+        on_duplicate works as in add_transaction(); each row costs a single
+        probe of the fingerprint index. Returns the number of inserted rows.
+        """
+        if on_duplicate not in DUPLICATE_MODES:
+            raise ValueError(f"Unknown duplicate mode: {on_duplicate}")
+        now = datetime.now()
+        # Ledgers repeat the same dates many times; parse each one only once
+        checked_dates = set()
+
+        def checked():
+            for date, type_, category, amount, description in rows:
+                if date not in checked_dates:
+                    self._validate(date, amount, now)
+                    checked_dates.add(date)
+                elif amount <= 0:
+                    raise ValueError("Amount must be greater than 0")
+                description = description or ""
+                fp = transaction_fingerprint(date, type_, category, amount, description)
+                yield (date, type_, category, amount, description, fp)
+
+        query = '''
+            INSERT INTO transactions (date, type, category, amount, description, fingerprint, duplicate_of)
+        '''
+        if on_duplicate == "flag":
+            query += '''
+                VALUES (?1, ?2, ?3, ?4, ?5, ?6,
+                        (SELECT id FROM transactions WHERE fingerprint = ?6 AND duplicate_of IS NULL))
+            '''
+        elif on_duplicate == "skip":
+            query += '''
+                VALUES (?, ?, ?, ?, ?, ?, NULL)
+                ON CONFLICT (fingerprint) WHERE duplicate_of IS NULL DO NOTHING
+            '''
+        else:
+            query += '''
+                VALUES (?, ?, ?, ?, ?, ?, NULL)
+                ON CONFLICT (fingerprint) WHERE duplicate_of IS NULL
+                DO UPDATE SET description = excluded.description
+            '''
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            # New rows get IDs above the current maximum; rowcount would also
+            # include merged rows, which are updates
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM transactions")
+            last_id = cursor.fetchone()[0]
+            cursor.executemany(query, checked())
+            cursor.execute("SELECT COUNT(*) FROM transactions WHERE id > ?", (last_id,))
+            count = cursor.fetchone()[0]
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return count
+
+    def delete_transaction(self, transaction_id):
+        """Delete a transaction by ID."""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT duplicate_of FROM transactions WHERE id = ?", (transaction_id,))
+            row = cursor.fetchone()
+            cursor.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
+            if row and row[0] is None:
+                self._promote_duplicates(cursor, transaction_id)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
 
     def update_transaction(self, transaction_id, date, type_, category, amount, description=""):
         """Update an existing transaction."""
-        if amount <= 0:
-            raise ValueError("Amount must be greater than 0")
-            
-        trans_date = datetime.strptime(date, "%Y-%m-%d")
-        if trans_date > datetime.now():
-            raise ValueError("Date cannot be in the future")
+        self._validate(date, amount)
+
+        fp = transaction_fingerprint(date, type_, category, amount, description)
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT fingerprint, duplicate_of FROM transactions WHERE id = ?", (transaction_id,))
+            old = cursor.fetchone()
+            if old and old[0] == fp:
+                duplicate_of = old[1]
+            else:
+                cursor.execute('''
+                    SELECT id FROM transactions
+                    WHERE fingerprint = ? AND duplicate_of IS NULL AND id != ?
+                ''', (fp, transaction_id))
+                original = cursor.fetchone()
+                duplicate_of = original[0] if original else None
+
+            cursor.execute('''
+                UPDATE transactions 
+                SET date = ?, type = ?, category = ?, amount = ?, description = ?,
+                    fingerprint = ?, duplicate_of = ?
+                WHERE id = ?
+            ''', (date, type_, category, amount, description, fp, duplicate_of, transaction_id))
+            if old and old[0] != fp and old[1] is None:
+                self._promote_duplicates(cursor, transaction_id)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def find_duplicates(self):
+        """Report transactions that have flagged duplicates.
 
+        Returns (id, date, type, category, amount, description, duplicate_ids)
+        for each original, newest first. Only flagged rows are read, through
+        the duplicate_of index.
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('''
-            UPDATE transactions 
-            SET date = ?, type = ?, category = ?, amount = ?, description = ?
-            WHERE id = ?
-        ''', (date, type_, category, amount, description, transaction_id))
-        conn.commit()
+            SELECT t.id, t.date, t.type, t.category, t.amount, t.description, group_concat(d.id)
+            FROM transactions d
+            JOIN transactions t ON t.id = d.duplicate_of
+            WHERE d.duplicate_of IS NOT NULL
+            GROUP BY d.duplicate_of
+            ORDER BY t.date DESC, t.id DESC
+        ''')
+        data = [row[:6] + ([int(i) for i in row[6].split(",")],) for row in cursor.fetchall()]
         conn.close()
+        return data
 
     def get_balance(self):
         """Calculate total balance."""
@@ -144,3 +763,85 @@ class DatabaseManager:
             summary[month][type_] = amount
             
         return summary
+
+    def set_budget(self, category, period, limit_amount):
+        """Set the spending limit of a category for a month (period: YYYY-MM)."""
+        if limit_amount <= 0:
+            raise ValueError("Budget limit must be greater than 0")
+        if datetime.strptime(period, "%Y-%m").strftime("%Y-%m") != period:
+            raise ValueError(f"Period must be in YYYY-MM format: {period}")
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO budgets (category, period, limit_amount) VALUES (?, ?, ?)
+                ON CONFLICT (category, period) DO UPDATE SET limit_amount = excluded.limit_amount
+            ''', (category, period, limit_amount))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def delete_budget(self, category, period):
+        """Remove the budget of a category for a month."""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM budgets WHERE category = ? AND period = ?", (category, period))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def get_budgets(self, period):
+        """Get (category, limit, spent) for every budget of a month."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT b.category, b.limit_amount, COALESCE(s.spent, 0.0)
+            FROM budgets b
+            LEFT JOIN category_spending s ON s.category = b.category AND s.period = b.period
+            WHERE b.period = ?
+            ORDER BY b.category
+        ''', (period,))
+        data = cursor.fetchall()
+        conn.close()
+        return data
+
+    def check_budget(self, type_, category, date, amount, transaction_id=None):
+        """Project a category's spending for the month of `date` if this transaction is saved.
+
+        Pass `transaction_id` when editing so the stored version is not counted twice.
+        Returns (limit, projected_spent), or None if the category has no budget.
+        """
+        if type_ != 'Expense':
+            return None
+        period = date[:7]
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT b.limit_amount, COALESCE(s.spent, 0.0)
+            FROM budgets b
+            LEFT JOIN category_spending s ON s.category = b.category AND s.period = b.period
+            WHERE b.category = ? AND b.period = ?
+        ''', (category, period))
+        budget = cursor.fetchone()
+        if budget is None:
+            conn.close()
+            return None
+        limit_amount, spent = budget
+
+        if transaction_id is not None:
+            cursor.execute("SELECT date, type, category, amount FROM transactions WHERE id = ?",
+                           (transaction_id,))
+            old = cursor.fetchone()
+            if old and old[1] == 'Expense' and old[2] == category and old[0][:7] == period:
+                spent -= old[3]
+        conn.close()
+        return limit_amount, spent + amount
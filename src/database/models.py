@@ -0,0 +1,70 @@
+class Transaction:
+    """One ledger row with typed fields.
+
+    __slots__ keeps each record to a fixed set of attributes with no
+    per-instance __dict__. Records also behave like the tuples the
+    database layer used to return: row[4] is the amount, and iterating
+    yields (id, date, type, category, amount, description), followed by
+    balance when the query computed one.
+    """
+
+    __slots__ = ("id", "date", "type", "category", "amount", "description", "balance")
+
+    FIELDS = ("id", "date", "type", "category", "amount", "description")
+
+    def __init__(self, id, date, type, category, amount, description="", balance=None):
+        self.id = id
+        self.date = date
+        self.type = type
+        self.category = category
+        self.amount = amount
+        self.description = description or ""
+        self.balance = balance
+
+    @classmethod
+    def row_factory(cls, cursor, row):
+        """sqlite3 row factory building records straight from query results."""
+        return cls(*row)
+
+    def as_tuple(self):
+        values = (self.id, self.date, self.type, self.category, self.amount, self.description)
+        if self.balance is not None:
+            values += (self.balance,)
+        return values
+
+    def to_dict(self):
+        data = dict(zip(self.FIELDS, self.as_tuple()))
+        if self.balance is not None:
+            data["balance"] = self.balance
+        return data
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.as_tuple()[index]
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("Transaction index out of range")
+        return getattr(self, self.__slots__[index])
+
+    def __iter__(self):
+        for name in self.__slots__[:len(self)]:
+            yield getattr(self, name)
+
+    def __len__(self):
+        return 6 if self.balance is None else 7
+
+    def __eq__(self, other):
+        if isinstance(other, Transaction):
+            return self.as_tuple() == other.as_tuple()
+        if isinstance(other, tuple):
+            return self.as_tuple() == other
+        return NotImplemented
+
+    def __hash__(self):
+        # Equal records, and a record and its equal tuple, hash the same
+        return hash(self.as_tuple())
+
+    def __repr__(self):
+        return f"Transaction{self.as_tuple()!r}"
@@ -8,6 +8,7 @@ from PyQt6.QtWidgets import QApplication
 from qfluentwidgets import setTheme, Theme
 from ui.main_window import MainWindow
 from database.db_manager import DatabaseManager
+from database.backup import BackupService
 
 def main():
     print("Creating QApplication...")
@@ -17,11 +18,17 @@ def main():
     setTheme(Theme.LIGHT)
     print("Theme set.")
     
-    # Initialize Database
+    # Initialize Database: the one instance shared by the whole application
     db = DatabaseManager()
     print("Database initialized.")
+
+    backups = BackupService(db)
+    backups.start()
+    # Stop backups before the database flushes and closes
+    app.aboutToQuit.connect(backups.stop)
+    app.aboutToQuit.connect(db.close)
     
-    w = MainWindow()
+    w = MainWindow(db)
     print("MainWindow created.")
     w.show()
     
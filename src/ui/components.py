@@ -1,13 +1,15 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QCompleter
-from PyQt6.QtCore import Qt, QDate
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QCompleter, QLabel
+from PyQt6.QtCore import Qt, QDate, QTimer
+from PyQt6.QtGui import QFont
 from qfluentwidgets import (MessageBoxBase, SubtitleLabel, LineEdit, CalendarPicker, 
-                            ComboBox, DoubleSpinBox, PrimaryPushButton, PushButton)
+                            ComboBox, DoubleSpinBox, PrimaryPushButton, PushButton, CaptionLabel)
 
 class TransactionDialog(MessageBoxBase):
-    def __init__(self, parent=None, transaction=None):
+    def __init__(self, parent=None, transaction=None, db=None):
         super().__init__(parent)
         self.titleLabel = SubtitleLabel("Добавить транзакцию", self)
         self.transaction = transaction
+        self.db = db
         
         # Form widgets
         self.datePicker = CalendarPicker(self)
@@ -26,6 +28,11 @@ class TransactionDialog(MessageBoxBase):
         self.descEdit = LineEdit(self)
         self.descEdit.setPlaceholderText("Описание")
 
+        self.budgetWarning = CaptionLabel(self)
+        self.budgetWarning.setStyleSheet("color: red")
+        self.budgetWarning.setWordWrap(True)
+        self.budgetWarning.hide()
+
         # Layout
         self.viewLayout.addWidget(self.titleLabel)
         self.viewLayout.addWidget(self.datePicker)
@@ -33,17 +40,18 @@ class TransactionDialog(MessageBoxBase):
         self.viewLayout.addWidget(self.categoryEdit)
         self.viewLayout.addWidget(self.amountSpinBox)
         self.viewLayout.addWidget(self.descEdit)
+        self.viewLayout.addWidget(self.budgetWarning)
 
         # Pre-fill if editing
         if transaction:
             self.titleLabel.setText("Редактировать транзакцию")
-            # transaction: (id, date, type, category, amount, desc)
-            qdate = QDate.fromString(transaction[1], "yyyy-MM-dd")
+            # transaction: Transaction record
+            qdate = QDate.fromString(transaction.date, "yyyy-MM-dd")
             self.datePicker.setDate(qdate)
-            self.typeComboBox.setCurrentText(transaction[2])
-            self.categoryEdit.setText(transaction[3])
-            self.amountSpinBox.setValue(transaction[4])
-            self.descEdit.setText(transaction[5])
+            self.typeComboBox.setCurrentText(transaction.type)
+            self.categoryEdit.setText(transaction.category)
+            self.amountSpinBox.setValue(transaction.amount)
+            self.descEdit.setText(transaction.description)
 
         # Validation for buttons
         self.widget.setMinimumWidth(350)
@@ -52,6 +60,25 @@ class TransactionDialog(MessageBoxBase):
         self.yesButton.setText("Сохранить")
         self.cancelButton.setText("Отмена")
 
+        if self.db is not None:
+            self.datePicker.dateChanged.connect(self.update_budget_warning)
+            self.typeComboBox.currentTextChanged.connect(self.update_budget_warning)
+            self.categoryEdit.textChanged.connect(self.update_budget_warning)
+            self.amountSpinBox.valueChanged.connect(self.update_budget_warning)
+            self.update_budget_warning()
+
+    def update_budget_warning(self, *args):
+        data = self.get_data()
+        t_id = self.transaction.id if self.transaction else None
+        status = self.db.check_budget(data['type_'], data['category'], data['date'], data['amount'], t_id)
+        if status is None or status[1] <= status[0]:
+            self.budgetWarning.hide()
+            return
+        limit_amount, spent = status
+        self.budgetWarning.setText(
+            f"Бюджет «{data['category']}» будет превышен: {spent:.2f} из {limit_amount:.2f} ₽")
+        self.budgetWarning.show()
+
     def get_data(self):
         return {
             'date': self.datePicker.date.toString("yyyy-MM-dd"),
@@ -60,3 +87,74 @@ class TransactionDialog(MessageBoxBase):
             'amount': self.amountSpinBox.value(),
             'description': self.descEdit.text().strip()
         }
+
+
+class BudgetDialog(MessageBoxBase):
+    def __init__(self, parent=None, period=None):
+        super().__init__(parent)
+        self.titleLabel = SubtitleLabel("Бюджет на месяц", self)
+        self.period = period or QDate.currentDate().toString("yyyy-MM")
+
+        self.periodLabel = CaptionLabel(f"Период: {self.period}", self)
+
+        self.categoryEdit = LineEdit(self)
+        self.categoryEdit.setPlaceholderText("Категория расходов")
+
+        self.limitSpinBox = DoubleSpinBox(self)
+        self.limitSpinBox.setRange(0.01, 10000000.00)
+        self.limitSpinBox.setValue(10000.00)
+
+        self.viewLayout.addWidget(self.titleLabel)
+        self.viewLayout.addWidget(self.periodLabel)
+        self.viewLayout.addWidget(self.categoryEdit)
+        self.viewLayout.addWidget(self.limitSpinBox)
+
+        self.widget.setMinimumWidth(350)
+        self.yesButton.setText("Сохранить")
+        self.cancelButton.setText("Отмена")
+
+    def get_data(self):
+        return {
+            'category': self.categoryEdit.text().strip(),
+            'period': self.period,
+            'limit_amount': self.limitSpinBox.value()
+        }
+
+
+class ProfilerOverlay(QLabel):
+    """Semi-transparent HUD with per-stage refresh latencies from a RefreshProfiler."""
+
+    def __init__(self, profiler, parent=None):
+        super().__init__(parent)
+        self.profiler = profiler
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
+        font = QFont("Consolas")
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        font.setPointSize(9)
+        self.setFont(font)
+        self.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 170); color: #7CFC00; padding: 8px; border-radius: 6px;")
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(500)
+        self.timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def toggle(self):
+        visible = not self.isVisible()
+        self.profiler.set_enabled(visible)
+        self.setVisible(visible)
+        if visible:
+            self.refresh()
+            self.raise_()
+            self.timer.start()
+        else:
+            self.timer.stop()
+
+    def refresh(self):
+        report = self.profiler.format_report()
+        self.setText("Профилирование обновления, мс  (Ctrl+Shift+P — скрыть, Ctrl+Shift+T — трасса)\n"
+                     + report)
+        self.adjustSize()
+        self.move(self.parentWidget().width() - self.width() - 20, 50)
@@ -1,24 +1,56 @@
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtGui import QIcon
-from qfluentwidgets import FluentWindow, NavigationItemPosition, FluentIcon as FIF, SplashScreen
+from PyQt6.QtWidgets import QApplication, QFileDialog
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QIcon, QKeySequence, QShortcut
+from qfluentwidgets import (FluentWindow, NavigationItemPosition, FluentIcon as FIF, SplashScreen,
+                            InfoBar, InfoBarPosition)
 from .views import DashboardInterface
+from .components import ProfilerOverlay
+from .profiler import RefreshProfiler
 
 class MainWindow(FluentWindow):
-    def __init__(self):
+    def __init__(self, db):
         super().__init__()
+        self.db = db
         self.initWindow()
+        self.profiler = RefreshProfiler()
 
         # Create sub interfaces
-        self.dashboardInterface = DashboardInterface(self)
+        self.dashboardInterface = DashboardInterface(self.db, self, self.profiler)
 
         # Add items to navigation interface
         self.initNavigation()
+        self.initProfiler()
 
     def initNavigation(self):
         self.addSubInterface(self.dashboardInterface, FIF.HOME, 'Главная')
 
         self.navigationInterface.addSeparator()
 
+    def initProfiler(self):
+        self.profilerOverlay = ProfilerOverlay(self.profiler, self)
+        QShortcut(QKeySequence("Ctrl+Shift+P"), self, activated=self.profilerOverlay.toggle)
+        QShortcut(QKeySequence("Ctrl+Shift+T"), self, activated=self.dump_profiler_trace)
+
+    def dump_profiler_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Сохранить трассу", "refresh_trace.json", "JSON Files (*.json)")
+        if not path:
+            return
+        self.profiler.dump_trace(path)
+        InfoBar.success(
+            title='Успех',
+            content=f'Трасса сохранена: {path}',
+            orient=Qt.Orientation.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP_RIGHT,
+            duration=2000,
+            parent=self
+        )
+
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        if hasattr(self, 'profilerOverlay') and self.profilerOverlay.isVisible():
+            self.profilerOverlay.refresh()
+
     def initWindow(self):
         self.resize(1100, 750)
         self.setMinimumWidth(760)
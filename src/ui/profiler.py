@@ -0,0 +1,119 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty sequence."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class RefreshProfiler:
+    """Times the stages of a UI refresh with a monotonic clock.
+
+    Stages nest: the outermost stage is one refresh, and the counters
+    (rows, widgets, ...) are reset at its start. Durations of the last
+    `history` runs of each stage are kept for p50/p95, and the last
+    `history` refreshes are kept as Chrome trace events.
+    While disabled, stage() and count() do nothing.
+    """
+
+    def __init__(self, history=200, enabled=False):
+        self.enabled = enabled
+        self.history = history
+        self._durations = defaultdict(lambda: deque(maxlen=history))
+        self._counters = defaultdict(int)
+        self._last_counters = {}
+        self._refreshes = deque(maxlen=history)
+        self._current = []
+        self._depth = 0
+        self._origin = time.perf_counter_ns()
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        if self._depth == 0:
+            self._counters.clear()
+            self._current = []
+        self._depth += 1
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            self._depth -= 1
+            self._durations[name].append((end - start) / 1e6)
+            self._current.append((name, start, end))
+            if self._depth == 0:
+                self._last_counters = dict(self._counters)
+                self._refreshes.append((self._current, self._last_counters))
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self._counters[name] += n
+
+    def stats(self):
+        """Return {stage: {"last", "p50", "p95", "samples"}} with times in milliseconds."""
+        return {
+            name: {
+                "last": samples[-1],
+                "p50": percentile(samples, 50),
+                "p95": percentile(samples, 95),
+                "samples": len(samples),
+            }
+            for name, samples in self._durations.items() if samples
+        }
+
+    def last_counters(self):
+        return dict(self._last_counters)
+
+    def reset(self):
+        self._durations.clear()
+        self._refreshes.clear()
+        self._last_counters = {}
+
+    def chrome_trace(self):
+        """Recent refreshes in Chrome trace event format (chrome://tracing, Perfetto)."""
+        pid, tid = os.getpid(), threading.get_ident()
+        events = []
+        for stages, counters in self._refreshes:
+            # The outermost stage ends last and carries the refresh's counters
+            for i, (name, start, end) in enumerate(stages):
+                event = {
+                    "name": name,
+                    "cat": "refresh",
+                    "ph": "X",
+                    "ts": (start - self._origin) / 1000,
+                    "dur": (end - start) / 1000,
+                    "pid": pid,
+                    "tid": tid,
+                }
+                if i == len(stages) - 1:
+                    event["args"] = counters
+                events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def format_report(self):
+        """Text table of per-stage latencies and the last refresh's counters."""
+        lines = [f"{'stage':<26}{'last':>8}{'p50':>8}{'p95':>8}{'n':>6}"]
+        for name, s in sorted(self.stats().items()):
+            lines.append(f"{name:<26}{s['last']:>8.2f}{s['p50']:>8.2f}{s['p95']:>8.2f}{s['samples']:>6}")
+        counters = self.last_counters()
+        if counters:
+            lines.append("  ".join(f"{k}: {v}" for k, v in sorted(counters.items())))
+        return "\n".join(lines)
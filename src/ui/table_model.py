@@ -0,0 +1,86 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class TransactionTableModel(QAbstractTableModel):
+    """Table model over Transaction records, loaded one page at a time.
+
+    Cells are formatted only when the view asks for them, so a refresh
+    creates no per-cell items, and the typed record behind a row is
+    available through record() or Qt.ItemDataRole.UserRole. When the view
+    scrolls to the end, fetchMore() asks `fetch_page` for the page after
+    the last loaded row.
+    """
+
+    HEADERS = ['№', 'Дата', 'Тип', 'Категория', 'Сумма', 'Описание', 'Баланс']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.records = []
+        self.fetch_page = None
+        self.page_size = 0
+        self.has_more = False
+
+    def set_records(self, records, fetch_page=None, page_size=0):
+        """Show the first page; fetch_page(after) returns the page after key (date, id)."""
+        self.beginResetModel()
+        self.records = list(records)
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.has_more = fetch_page is not None and len(self.records) == page_size
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.has_more
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        last = self.records[-1]
+        page = self.fetch_page((last.date, last.id))
+        self.has_more = len(page) == self.page_size
+        if not page:
+            return
+        first = len(self.records)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self.records.extend(page)
+        self.endInsertRows()
+
+    def record(self, row):
+        return self.records[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self.records[index.row()]
+        if role == Qt.ItemDataRole.UserRole:
+            return record
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        column = index.column()
+        if column == 0:
+            return str(index.row() + 1)
+        if column == 1:
+            return record.date
+        if column == 2:
+            return record.type
+        if column == 3:
+            return record.category
+        if column == 4:
+            return f"{record.amount:.2f}"
+        if column == 5:
+            return record.description
+        if record.balance is None:
+            return ""
+        return f"{record.balance:.2f}"
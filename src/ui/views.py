@@ -1,5 +1,5 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                             QHeaderView, QTableWidgetItem, QFrame, QSizePolicy, QFileDialog)
+                             QHeaderView, QFrame, QSizePolicy, QFileDialog)
 from PyQt6.QtCore import Qt, QDate
 from PyQt6.QtCharts import QChart, QChartView, QBarSeries, QBarSet, QBarCategoryAxis, QValueAxis
 from PyQt6.QtGui import QPainter
@@ -15,18 +15,25 @@ from reportlab.graphics.shapes import Drawing
 from reportlab.graphics.charts.barcharts import VerticalBarChart
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
-from qfluentwidgets import (TableWidget, PrimaryPushButton, PushButton, 
+from qfluentwidgets import (TableView, PrimaryPushButton, PushButton, 
                             CalendarPicker, ComboBox, CardWidget, TitleLabel,
-                            BodyLabel, StrongBodyLabel, FluentIcon as FIF, InfoBar, InfoBarPosition)
+                            BodyLabel, StrongBodyLabel, FluentIcon as FIF, InfoBar, InfoBarPosition,
+                            ProgressBar, TransparentToolButton)
 
-from database.db_manager import DatabaseManager
-from .components import TransactionDialog
+from database.columnar import export_transactions, import_transactions
+from .components import TransactionDialog, BudgetDialog
+from .profiler import RefreshProfiler
+from .table_model import TransactionTableModel
 
 class DashboardInterface(QWidget):
-    def __init__(self, parent=None):
+    # Rows loaded per page of the transactions table
+    PAGE_SIZE = 200
+
+    def __init__(self, db, parent=None, profiler=None):
         super().__init__(parent)
         self.setObjectName("DashboardInterface")
-        self.db = DatabaseManager()
+        self.db = db
+        self.profiler = profiler or RefreshProfiler()
         
         self.mainLayout = QHBoxLayout(self)
         self.mainLayout.setContentsMargins(20, 20, 20, 20)
@@ -60,6 +67,10 @@ class DashboardInterface(QWidget):
         self.exportExcelBtn.clicked.connect(self.export_to_excel)
         self.exportPdfBtn = PushButton(FIF.PRINT, "Экспорт PDF", self.leftPanel)
         self.exportPdfBtn.clicked.connect(self.export_to_pdf)
+        self.exportColumnarBtn = PushButton(FIF.SAVE, "Экспорт Parquet", self.leftPanel)
+        self.exportColumnarBtn.clicked.connect(self.export_to_columnar)
+        self.importColumnarBtn = PushButton(FIF.DOWNLOAD, "Импорт Parquet", self.leftPanel)
+        self.importColumnarBtn.clicked.connect(self.import_from_columnar)
 
         self.leftLayout.addWidget(self.filterLabel)
         self.leftLayout.addWidget(BodyLabel("От:", self.leftPanel))
@@ -74,6 +85,8 @@ class DashboardInterface(QWidget):
         self.leftLayout.addWidget(self.deleteBtn)
         self.leftLayout.addWidget(self.exportExcelBtn)
         self.leftLayout.addWidget(self.exportPdfBtn)
+        self.leftLayout.addWidget(self.exportColumnarBtn)
+        self.leftLayout.addWidget(self.importColumnarBtn)
         self.leftLayout.addStretch(1)
 
         # --- Center Panel: Table ---
@@ -82,14 +95,14 @@ class DashboardInterface(QWidget):
         self.centerLayout.setContentsMargins(0, 0, 0, 0)
         
         self.tableTitle = TitleLabel("Транзакции", self.centerPanel)
-        self.table = TableWidget(self.centerPanel)
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(['№', 'Дата', 'Тип', 'Категория', 'Сумма', 'Описание'])
+        self.tableModel = TransactionTableModel(self)
+        self.table = TableView(self.centerPanel)
+        self.table.setModel(self.tableModel)
         self.table.verticalHeader().hide()
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.table.setEditTriggers(TableWidget.EditTrigger.NoEditTriggers)
-        self.table.setSelectionBehavior(TableWidget.SelectionBehavior.SelectRows)
-        self.table.setSelectionMode(TableWidget.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(TableView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(TableView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(TableView.SelectionMode.SingleSelection)
         self.table.doubleClicked.connect(self.show_edit_dialog)
 
         self.centerLayout.addWidget(self.tableTitle)
@@ -122,6 +135,21 @@ class DashboardInterface(QWidget):
         self.rightLayout.addWidget(self.incomeCard)
         self.rightLayout.addWidget(self.expenseCard)
         self.rightLayout.addWidget(self.chartView, 1)
+
+        # Budgets for the current month
+        self.budgetHeader = QHBoxLayout()
+        self.budgetsLabel = StrongBodyLabel("Бюджеты", self.rightPanel)
+        self.addBudgetBtn = TransparentToolButton(FIF.ADD, self.rightPanel)
+        self.addBudgetBtn.clicked.connect(self.show_budget_dialog)
+        self.budgetHeader.addWidget(self.budgetsLabel)
+        self.budgetHeader.addStretch(1)
+        self.budgetHeader.addWidget(self.addBudgetBtn)
+        self.budgetList = QWidget(self.rightPanel)
+        self.budgetListLayout = QVBoxLayout(self.budgetList)
+        self.budgetListLayout.setContentsMargins(0, 0, 0, 0)
+
+        self.rightLayout.addLayout(self.budgetHeader)
+        self.rightLayout.addWidget(self.budgetList)
         self.rightLayout.addStretch(1)
 
         # Add panels to main layout
@@ -147,46 +175,79 @@ class DashboardInterface(QWidget):
     def load_data(self):
         start = self.dateStart.date.toString("yyyy-MM-dd")
         end = self.dateEnd.date.toString("yyyy-MM-dd")
-        
-        rows = self.db.get_transactions(start, end)
-        self.table.setRowCount(len(rows))
-        
-        for i, row in enumerate(rows):
-            # row: (id, date, type, category, amount, desc)
-            # We want to display: (i+1, date, type, category, amount, desc)
-            
-            # Column 0: Sequential Number
-            item_no = QTableWidgetItem(str(i + 1))
-            item_no.setData(Qt.ItemDataRole.UserRole, row[0]) # Store real ID
-            self.table.setItem(i, 0, item_no)
-            
-            # Other columns
-            for j in range(1, 6):
-                val = row[j]
-                item = QTableWidgetItem(str(val))
-                if j == 4: # Amount
-                    item.setText(f"{val:.2f}")
-                self.table.setItem(i, j, item)
-        
-        self.update_stats()
+
+        with self.profiler.stage("refresh"):
+            def fetch_page(after=None):
+                return self.db.get_transactions_with_balance(start, end, self.PAGE_SIZE, after)
+
+            with self.profiler.stage("load_data.sql"):
+                rows = fetch_page()
+
+            # The model formats cells on demand and loads further pages as
+            # the table scrolls; no per-cell items are built
+            with self.profiler.stage("load_data.model"):
+                self.tableModel.set_records(rows, fetch_page, self.PAGE_SIZE)
+            self.profiler.count("rows", len(rows))
+
+            self.update_stats()
 
     def update_stats(self):
-        balance, income, expense = self.db.get_balance()
-        self.balanceCard.findChild(TitleLabel).setText(f"{balance:.2f} ₽")
-        self.incomeCard.findChild(TitleLabel).setText(f"{income:.2f} ₽")
-        self.expenseCard.findChild(TitleLabel).setText(f"{expense:.2f} ₽")
+        with self.profiler.stage("update_stats.sql"):
+            balance, income, expense = self.db.get_balance()
+        with self.profiler.stage("update_stats.findChild"):
+            self.balanceCard.findChild(TitleLabel).setText(f"{balance:.2f} ₽")
+            self.incomeCard.findChild(TitleLabel).setText(f"{income:.2f} ₽")
+            self.expenseCard.findChild(TitleLabel).setText(f"{expense:.2f} ₽")
         self.update_chart_data()
+        self.update_budgets()
+
+    def update_budgets(self):
+        with self.profiler.stage("update_budgets"):
+            while self.budgetListLayout.count():
+                widget = self.budgetListLayout.takeAt(0).widget()
+                if widget:
+                    widget.deleteLater()
+
+            period = QDate.currentDate().toString("yyyy-MM")
+            budgets = self.db.get_budgets(period)
+            if not budgets:
+                self.budgetListLayout.addWidget(BodyLabel("Нет бюджетов на этот месяц", self.budgetList))
+                self.profiler.count("widgets", 1)
+                return
+
+            for category, limit_amount, spent in budgets:
+                label = BodyLabel(f"{category}: {spent:.2f} / {limit_amount:.2f} ₽", self.budgetList)
+                bar = ProgressBar(self.budgetList)
+                bar.setValue(min(100, int(spent / limit_amount * 100)))
+                if spent > limit_amount:
+                    label.setStyleSheet("color: red")
+                    bar.error()
+                self.budgetListLayout.addWidget(label)
+                self.budgetListLayout.addWidget(bar)
+            self.profiler.count("widgets", 2 * len(budgets))
+
+    def show_budget_dialog(self):
+        dialog = BudgetDialog(self.window())
+        if dialog.exec():
+            data = dialog.get_data()
+            if not data['category']:
+                return
+            self.db.set_budget(**data)
+            self.update_budgets()
 
     def update_chart_data(self):
-        self.chart.removeAllSeries()
-        for axis in self.chart.axes():
-            self.chart.removeAxis(axis)
-            
-        summary = self.db.get_monthly_summary()
-        
-        if not summary:
-            return
+        with self.profiler.stage("update_chart_data.sql"):
+            summary = self.db.get_monthly_summary()
 
+        with self.profiler.stage("update_chart_data.series"):
+            self.chart.removeAllSeries()
+            for axis in self.chart.axes():
+                self.chart.removeAxis(axis)
+
+            if summary:
+                self.build_chart_series(summary)
+
+    def build_chart_series(self, summary):
         set0 = QBarSet("Доходы")
         set1 = QBarSet("Расходы")
         
@@ -216,6 +277,7 @@ class DashboardInterface(QWidget):
         axisY.setRange(0, max_val * 1.1 if max_val > 0 else 100)
         self.chart.addAxis(axisY, Qt.AlignmentFlag.AlignLeft)
         series.attachAxis(axisY)
+        self.profiler.count("chart_points", 2 * len(categories))
 
     def reset_filters(self):
         self.dateStart.setDate(QDate.currentDate().addMonths(-1))
@@ -231,13 +293,10 @@ class DashboardInterface(QWidget):
         # Columns: ID, Date, Type, Category, Amount, Description
         # We want to export sequential numbers, not DB IDs
         
-        export_data = []
-        for i, row in enumerate(rows):
-            # row: (id, date, type, category, amount, desc)
-            # new row: (i+1, date, type, category, amount, desc)
-            new_row = list(row)
-            new_row[0] = i + 1
-            export_data.append(new_row)
+        export_data = [
+            [i + 1, t.date, t.type, t.category, t.amount, t.description]
+            for i, t in enumerate(rows)
+        ]
 
         df = pd.DataFrame(export_data, columns=['№', 'Дата', 'Тип', 'Категория', 'Сумма', 'Описание'])
         
@@ -449,9 +508,8 @@ class DashboardInterface(QWidget):
         # Header
         data = [['№', 'Дата', 'Тип', 'Категория', 'Сумма', 'Описание']]
         # Rows
-        for i, row in enumerate(rows):
-            # row: id, date, type, category, amount, desc
-            data.append([i + 1, row[1], row[2], row[3], f"{row[4]:.2f}", row[5]])
+        for i, t in enumerate(rows):
+            data.append([i + 1, t.date, t.type, t.category, f"{t.amount:.2f}", t.description])
 
         table = Table(data, colWidths=[40, 80, 60, 100, 80, 160])
         
@@ -474,8 +532,67 @@ class DashboardInterface(QWidget):
         # Build
         doc.build(elements)
 
+    def export_to_columnar(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Сохранить Parquet / Arrow", "transactions.parquet",
+            "Parquet Files (*.parquet);;Arrow IPC Files (*.arrow)")
+        if not path:
+            return
+
+        try:
+            count = export_transactions(self.db, path)
+            InfoBar.success(
+                title='Успех',
+                content=f'Экспортировано строк: {count}\n{path}',
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=2000,
+                parent=self
+            )
+        except Exception as e:
+            InfoBar.error(
+                title='Ошибка',
+                content=f'Произошла ошибка при сохранении: {str(e)}',
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=5000,
+                parent=self
+            )
+
+    def import_from_columnar(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Открыть Parquet / Arrow", "",
+            "Parquet / Arrow Files (*.parquet *.arrow *.feather *.arrows)")
+        if not path:
+            return
+
+        try:
+            count = import_transactions(self.db, path)
+            self.load_data()
+            InfoBar.success(
+                title='Успех',
+                content=f'Импортировано строк: {count}',
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=2000,
+                parent=self
+            )
+        except Exception as e:
+            InfoBar.error(
+                title='Ошибка',
+                content=f'Не удалось импортировать файл: {str(e)}',
+                orient=Qt.Orientation.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=5000,
+                parent=self
+            )
+
     def delete_transaction(self):
-        row = self.table.currentRow()
+        row = self.table.currentIndex().row()
         if row < 0:
             InfoBar.warning(
                 title='Внимание',
@@ -488,8 +605,7 @@ class DashboardInterface(QWidget):
             )
             return
 
-        # Retrieve real ID from UserRole
-        t_id = self.table.item(row, 0).data(Qt.ItemDataRole.UserRole)
+        t_id = self.tableModel.record(row).id
         
         # Confirm deletion (optional, but good practice)
         # For now, just delete
@@ -517,7 +633,7 @@ class DashboardInterface(QWidget):
             )
 
     def show_add_dialog(self):
-        dialog = TransactionDialog(self.window())
+        dialog = TransactionDialog(self.window(), db=self.db)
         if dialog.exec():
             data = dialog.get_data()
             try:
@@ -528,26 +644,18 @@ class DashboardInterface(QWidget):
                 print(f"Error: {e}")
 
     def show_edit_dialog(self):
-        row = self.table.currentRow()
+        row = self.table.currentIndex().row()
         if row < 0:
             return
-            
-        # Get data from table
-        # Retrieve real ID from UserRole
-        t_id = self.table.item(row, 0).data(Qt.ItemDataRole.UserRole)
-        date = self.table.item(row, 1).text()
-        type_ = self.table.item(row, 2).text()
-        cat = self.table.item(row, 3).text()
-        amt = float(self.table.item(row, 4).text())
-        desc = self.table.item(row, 5).text()
-        
-        transaction = (t_id, date, type_, cat, amt, desc)
+
+        # Typed values straight from the record, not parsed back from cell text
+        transaction = self.tableModel.record(row)
         
-        dialog = TransactionDialog(self.window(), transaction)
+        dialog = TransactionDialog(self.window(), transaction, db=self.db)
         if dialog.exec():
             data = dialog.get_data()
             try:
-                self.db.update_transaction(t_id, **data)
+                self.db.update_transaction(transaction.id, **data)
                 self.load_data()
             except ValueError as e:
                 print(f"Error: {e}")
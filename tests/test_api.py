@@ -0,0 +1,180 @@
+import asyncio
+import http.client
+import json
+import os
+import socket
+import sys
+import urllib.error
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from database.db_manager import DatabaseManager
+from api.server import LedgerServer
+
+ROWS = [
+    {"date": "2023-10-01", "type": "Income", "category": "Salary", "amount": 1000.0, "description": "October"},
+    {"date": "2023-10-02", "type": "Expense", "category": "Food", "amount": 12.5, "description": "Coffee"},
+    {"date": "2023-10-03", "type": "Expense", "category": "Transport", "amount": 3.0, "description": "Bus"},
+]
+
+def fetch(port, path, data=None, content_type="application/json"):
+    request = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=data)
+    if data is not None:
+        request.add_header("Content-Type", content_type)
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, response.headers.get("Content-Type"), response.read().decode("utf-8")
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.get("Content-Type"), e.read().decode("utf-8")
+
+def run_with_server(tmp_path, scenario):
+    async def main():
+        server = await LedgerServer(DatabaseManager(str(tmp_path / "finance.db")), port=0, readers=2).start()
+        try:
+            return await asyncio.to_thread(scenario, server.port)
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+def test_bulk_insert_and_keyset_pages(tmp_path):
+    def scenario(port):
+        status, _, body = fetch(port, "/transactions/bulk", json.dumps(ROWS).encode())
+        assert status == 200
+        assert json.loads(body) == {"received": 3, "inserted": 3}
+
+        ndjson = "\n".join(json.dumps(r) for r in ROWS).encode()
+        status, _, body = fetch(port, "/transactions/bulk?on_duplicate=skip", ndjson, "application/x-ndjson")
+        assert json.loads(body)["inserted"] == 0
+
+        status, _, body = fetch(port, "/transactions?limit=2")
+        page = json.loads(body)
+        assert [i["date"] for i in page["items"]] == ["2023-10-03", "2023-10-02"]
+        nxt = page["next"]
+        status, _, body = fetch(port, f"/transactions?limit=2&after_date={nxt['after_date']}&after_id={nxt['after_id']}")
+        page = json.loads(body)
+        assert [i["date"] for i in page["items"]] == ["2023-10-01"]
+        assert page["next"] is None
+
+    run_with_server(tmp_path, scenario)
+
+def test_summary_search_and_stream(tmp_path):
+    def scenario(port):
+        fetch(port, "/transactions/bulk", json.dumps(ROWS).encode())
+
+        summary = json.loads(fetch(port, "/summary")[2])
+        assert summary["balance"] == 984.5
+        assert summary["by_category"]["Expense"] == {"Food": 12.5, "Transport": 3.0}
+
+        found = json.loads(fetch(port, "/search?q=coff")[2])["items"]
+        assert [i["category"] for i in found] == ["Food"]
+
+        status, content_type, body = fetch(port, "/transactions.ndjson")
+        assert status == 200
+        assert content_type.startswith("application/x-ndjson")
+        assert sorted(json.loads(line)["category"] for line in body.splitlines()) == ["Food", "Salary", "Transport"]
+
+    run_with_server(tmp_path, scenario)
+
+def test_errors(tmp_path):
+    def scenario(port):
+        assert fetch(port, "/nope")[0] == 404
+        assert fetch(port, "/summary", b"[]")[0] == 405
+        bad = [dict(ROWS[0], amount=-1)]
+        assert fetch(port, "/transactions/bulk", json.dumps(bad).encode())[0] == 400
+        unpadded = [dict(ROWS[1], date="2023-1-5")]
+        assert fetch(port, "/transactions/bulk", json.dumps(unpadded).encode())[0] == 400
+        assert fetch(port, "/transactions?limit=0")[0] == 400
+
+    run_with_server(tmp_path, scenario)
+
+def seed_large_ledger(tmp_path):
+    # Large enough that an export cannot sit entirely in socket buffers
+    dates = [f"2023-{m:02d}-{d:02d}" for m in range(1, 13) for d in range(1, 29)]
+    rows = [(date, "Expense", "Food", float(i + 1), f"row {i} " + "x" * 400)
+            for date in dates for i in range(60)]
+    DatabaseManager(str(tmp_path / "finance.db")).add_transactions(rows)
+    return rows
+
+def slow_client(port):
+    # A tiny receive buffer keeps most of the export waiting on the server
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.settimeout(10)
+    sock.connect(("127.0.0.1", port))
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.sock = sock
+    return conn
+
+def test_writes_succeed_while_stream_is_half_read(tmp_path):
+    rows = seed_large_ledger(tmp_path)
+
+    def scenario(port):
+        conn = slow_client(port)
+        conn.request("GET", "/transactions.ndjson")
+        response = conn.getresponse()
+        try:
+            assert json.loads(response.readline())["date"] == "2023-12-28"
+
+            status, _, body = fetch(port, "/transactions/bulk", json.dumps(ROWS).encode())
+            assert status == 200
+            assert json.loads(body)["inserted"] == 3
+
+            count = 1 + sum(1 for line in response.read().splitlines() if line)
+            assert count >= len(rows)
+        finally:
+            response.close()
+            conn.close()
+
+    run_with_server(tmp_path, scenario)
+
+def test_stalled_streams_do_not_starve_readers(tmp_path):
+    seed_large_ledger(tmp_path)
+
+    def scenario(port):
+        # As many stalled downloads as reader threads (run_with_server uses 2)
+        clients = []
+        for _ in range(2):
+            conn = slow_client(port)
+            conn.request("GET", "/transactions.ndjson")
+            response = conn.getresponse()
+            response.readline()
+            clients.append((conn, response))
+
+        status, _, body = fetch(port, "/summary")
+        assert status == 200
+        assert json.loads(body)["expense"] > 0
+        # Still connected: the server must close around them
+        return clients
+
+    clients = run_with_server(tmp_path, scenario)
+    for conn, response in clients:
+        response.close()
+        conn.close()
+
+def test_stream_failure_drops_connection(tmp_path, monkeypatch):
+    DatabaseManager(str(tmp_path / "finance.db")).add_transactions(
+        [("2023-10-01", "Expense", "Food", float(i + 1), "") for i in range(1000)])
+    read_page = DatabaseManager.get_transactions_page
+
+    def failing_page(self, start_date=None, end_date=None, after=None, limit=100):
+        if after is not None:
+            raise RuntimeError("disk I/O error")
+        return read_page(self, start_date, end_date, after, limit)
+
+    monkeypatch.setattr(DatabaseManager, "get_transactions_page", failing_page)
+
+    def scenario(port):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        conn.request("GET", "/transactions.ndjson")
+        response = conn.getresponse()
+        assert response.status == 200
+        with pytest.raises(http.client.IncompleteRead) as e:
+            response.read()
+        assert len(e.value.partial.splitlines()) == 1000
+        assert b"Internal error" not in e.value.partial
+        conn.close()
+
+    run_with_server(tmp_path, scenario)
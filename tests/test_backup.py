@@ -0,0 +1,72 @@
+import gzip
+import os
+import pytest
+from src.database.db_manager import DatabaseManager
+from src.database.backup import BackupService, SnapshotAborted
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "finance.db"))
+    manager.add_transaction("2023-10-01", "Income", "Salary", 1000.0)
+    return manager
+
+def test_snapshot_and_restore(db, tmp_path):
+    service = BackupService(db, str(tmp_path / "backups"), pages=1, sleep=0)
+    path = service.create_snapshot()
+    assert path.endswith(".db.gz")
+    assert service.verify(path)
+    with gzip.open(path, "rb") as f:
+        assert f.read(16) == b"SQLite format 3\x00"
+
+    db.add_transaction("2023-10-02", "Expense", "Food", 200.0)
+    assert len(db.get_transactions()) == 2
+    service.restore(path)
+    assert len(db.get_transactions()) == 1
+
+def test_rotation_keeps_newest(db, tmp_path):
+    service = BackupService(db, str(tmp_path / "backups"), keep=2)
+    paths = [service.create_snapshot() for _ in range(4)]
+    assert service.list_snapshots() == [paths[3], paths[2]]
+
+def test_restore_rejects_corrupt_snapshot(db, tmp_path):
+    service = BackupService(db, str(tmp_path / "backups"))
+    path = service.create_snapshot()
+    with open(path, "ab") as f:
+        f.write(b"garbage")
+    assert not service.verify(path)
+    with pytest.raises(ValueError):
+        service.restore(path)
+
+def test_restore_into_working_copy(tmp_path):
+    db_name = str(tmp_path / "finance.db")
+    db = DatabaseManager(db_name, in_memory=True, flush_interval=None)
+    db.add_transaction("2023-10-01", "Income", "Salary", 1000.0)
+    service = BackupService(db, str(tmp_path / "backups"))
+    path = service.create_snapshot()
+
+    db.add_transaction("2023-10-02", "Expense", "Food", 200.0)
+    service.restore(path)
+    assert len(db.get_transactions()) == 1
+    db.close()
+    assert len(DatabaseManager(db_name).get_transactions()) == 1
+
+def test_stop_aborts_snapshot_in_progress(db, tmp_path):
+    backup_dir = str(tmp_path / "backups")
+    service = BackupService(db, backup_dir, interval=0.01, pages=1, sleep=0)
+    check_stop = service._check_stop
+
+    def stop_after_first_step(*args):
+        service._stop.set()
+        check_stop(*args)
+
+    service._check_stop = stop_after_first_step
+    with pytest.raises(SnapshotAborted):
+        service.create_snapshot()
+    assert os.listdir(backup_dir) == []
+
+    # In the background thread an aborted snapshot ends the thread quietly
+    service.start()
+    service._thread.join(5)
+    assert not service._thread.is_alive()
+    assert service.last_error is None
+    assert os.listdir(backup_dir) == []
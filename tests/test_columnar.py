@@ -0,0 +1,49 @@
+import pytest
+from src.database.db_manager import DatabaseManager
+
+pytest.importorskip("pyarrow")
+from src.database.columnar import export_transactions, import_transactions
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "finance.db"))
+    manager.add_transactions([
+        ("2023-10-01", "Income", "Salary", 5000.0, "October"),
+        ("2023-10-02", "Expense", "Food", 12.5, ""),
+        ("2023-10-03", "Expense", "Transport", 3.2, "Bus"),
+    ])
+    return manager
+
+@pytest.mark.parametrize("name", ["out.parquet", "out.arrow", "out.arrows"])
+def test_columnar_round_trip(db, tmp_path, name):
+    path = str(tmp_path / name)
+    assert export_transactions(db, path, batch_size=2) == 3
+
+    target = DatabaseManager(str(tmp_path / "target.db"))
+    assert import_transactions(target, path, batch_size=2) == 3
+    strip_id = lambda rows: sorted(row[1:] for row in rows)
+    assert strip_id(target.get_transactions()) == strip_id(db.get_transactions())
+
+def test_bulk_insert_is_atomic(db):
+    with pytest.raises(ValueError):
+        db.add_transactions([
+            ("2023-11-01", "Income", "Salary", 100.0, ""),
+            ("2023-11-02", "Expense", "Food", -1.0, ""),
+        ])
+    assert len(db.get_transactions()) == 3
+
+def test_arrow_files_are_feather_compatible(db, tmp_path):
+    from pyarrow import feather
+    path = str(tmp_path / "out.arrow")
+    export_transactions(db, path, batch_size=2)
+    table = feather.read_table(path)
+    assert table.num_rows == 3
+    assert sorted(table.column("category").to_pylist()) == ["Food", "Salary", "Transport"]
+
+    # Files written by other tools (Feather v2) import as well
+    feather_path = str(tmp_path / "other.feather")
+    feather.write_feather(table.drop_columns(["id"]), feather_path)
+    target = DatabaseManager(str(tmp_path / "target.db"))
+    assert import_transactions(target, feather_path) == 3
+    strip_id = lambda rows: sorted(row[1:] for row in rows)
+    assert strip_id(target.get_transactions()) == strip_id(db.get_transactions())
@@ -29,3 +29,294 @@ def test_balance_calculation(db):
 def test_invalid_transaction(db):
     with pytest.raises(ValueError):
         db.add_transaction("2023-10-01", "Income", "Test", -100.0)
+
+def test_dates_must_be_zero_padded(db):
+    t_id = db.add_transaction("2023-10-01", "Expense", "Food", 10.0)
+    with pytest.raises(ValueError):
+        db.add_transaction("2023-1-5", "Expense", "Food", 10.0)
+    with pytest.raises(ValueError):
+        db.add_transactions([("2023-1-5", "Expense", "Food", 10.0, "")])
+    with pytest.raises(ValueError):
+        db.update_transaction(t_id, "2023-1-5", "Expense", "Food", 10.0, "")
+    with pytest.raises(ValueError):
+        db.set_budget("Food", "2023-1", 100.0)
+    assert len(db.get_transactions()) == 1
+
+def test_in_memory_mode_flushes_to_disk(tmp_path):
+    db_name = str(tmp_path / "working_copy.db")
+    DatabaseManager(db_name).add_transaction("2023-10-01", "Income", "Salary", 1000.0)
+
+    manager = DatabaseManager(db_name, in_memory=True, flush_interval=None, flush_pages=1)
+    assert len(manager.get_transactions()) == 1
+
+    manager.add_transaction("2023-10-02", "Expense", "Food", 200.0)
+    # Not written back yet: the file still has only the original row
+    assert len(DatabaseManager(db_name).get_transactions()) == 1
+
+    assert manager.flush() is True
+    assert manager.flush() is False
+    assert len(DatabaseManager(db_name).get_transactions()) == 2
+
+    manager.delete_transaction(manager.get_transactions()[0][0])
+    manager.close()
+    assert len(DatabaseManager(db_name).get_transactions()) == 1
+
+def test_in_memory_mode_timer_flush(tmp_path):
+    import time
+    db_name = str(tmp_path / "timer.db")
+    manager = DatabaseManager(db_name, in_memory=True, flush_interval=0.05)
+    manager.add_transaction("2023-10-01", "Income", "Salary", 1000.0)
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and not DatabaseManager(db_name).get_transactions():
+        time.sleep(0.05)
+    assert len(DatabaseManager(db_name).get_transactions()) == 1
+    manager.close()
+
+def _naive_balances(db):
+    rows = sorted(db.get_transactions(), key=lambda r: (r[1], r[0]))
+    balance, result = 0.0, {}
+    for row in rows:
+        balance += row[4] if row[2] == "Income" else -row[4]
+        result[row[0]] = balance
+    return result
+
+def test_running_balance_uses_checkpoints(db):
+    db.add_transactions([
+        ("2023-08-15", "Income", "Salary", 1000.0, ""),
+        ("2023-09-01", "Expense", "Rent", 400.0, ""),
+        ("2023-09-20", "Expense", "Food", 50.0, ""),
+        ("2023-10-05", "Income", "Bonus", 200.0, ""),
+        ("2023-10-05", "Expense", "Food", 30.0, ""),
+    ])
+    expected = _naive_balances(db)
+
+    rows = db.get_transactions_with_balance("2023-10-01", "2023-10-31")
+    assert [r[0] for r in rows] == sorted((r[0] for r in rows), reverse=True)
+    assert all(r[6] == expected[r[0]] for r in rows)
+    assert len(rows) == 2
+
+    first = db.get_transactions_with_balance(limit=2)
+    page = db.get_transactions_with_balance(limit=2, after=(first[-1].date, first[-1].id))
+    assert len(page) == 2
+    assert [r.date for r in first + page] == ["2023-10-05", "2023-10-05", "2023-09-20", "2023-09-01"]
+    assert all(r[6] == expected[r[0]] for r in page)
+
+    conn = db.get_connection()
+    assert conn.execute("SELECT month FROM balance_checkpoints ORDER BY month").fetchall() == [("2023-08",), ("2023-09",)]
+    conn.close()
+
+    # Editing September drops its checkpoint and every later one
+    september = [r for r in db.get_transactions() if r[3] == "Rent"][0]
+    db.update_transaction(september[0], "2023-09-01", "Expense", "Rent", 500.0)
+    conn = db.get_connection()
+    assert conn.execute("SELECT month FROM balance_checkpoints ORDER BY month").fetchall() == [("2023-08",)]
+    conn.close()
+
+    expected = _naive_balances(db)
+    rows = db.get_transactions_with_balance()
+    assert len(rows) == 5
+    assert all(r[6] == expected[r[0]] for r in rows)
+
+def test_budget_spending_counters(db):
+    db.add_transaction("2023-10-01", "Income", "Salary", 1000.0)
+    db.add_transaction("2023-10-02", "Expense", "Food", 120.0)
+    db.add_transaction("2023-11-02", "Expense", "Food", 50.0)
+    db.set_budget("Food", "2023-10", 150.0)
+    assert db.get_budgets("2023-10") == [("Food", 150.0, 120.0)]
+
+    assert db.check_budget("Expense", "Food", "2023-10-05", 40.0) == (150.0, 160.0)
+    assert db.check_budget("Income", "Food", "2023-10-05", 40.0) is None
+    assert db.check_budget("Expense", "Rent", "2023-10-05", 40.0) is None
+
+    food = [r for r in db.get_transactions() if r[1] == "2023-10-02"][0]
+    # Editing replaces the stored amount instead of adding to it
+    assert db.check_budget("Expense", "Food", "2023-10-02", 100.0, food[0]) == (150.0, 100.0)
+
+    db.update_transaction(food[0], "2023-11-03", "Expense", "Food", 80.0)
+    assert db.get_budgets("2023-10") == [("Food", 150.0, 0.0)]
+    db.delete_transaction(food[0])
+    db.set_budget("Food", "2023-11", 100.0)
+    assert db.get_budgets("2023-11") == [("Food", 100.0, 50.0)]
+
+def test_budget_counters_backfilled(tmp_path):
+    import sqlite3
+    db_name = str(tmp_path / "old.db")
+    conn = sqlite3.connect(db_name)
+    conn.execute("CREATE TABLE transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL, "
+                 "type TEXT NOT NULL, category TEXT NOT NULL, amount REAL NOT NULL, description TEXT)")
+    conn.execute("INSERT INTO transactions (date, type, category, amount) VALUES ('2023-10-01', 'Expense', 'Food', 30.0)")
+    conn.commit()
+    conn.close()
+
+    manager = DatabaseManager(db_name)
+    manager.set_budget("Food", "2023-10", 20.0)
+    assert manager.get_budgets("2023-10") == [("Food", 20.0, 30.0)]
+
+STATEMENT = [
+    ("2023-10-01", "Income", "Salary", 1000.0, "ACME payroll"),
+    ("2023-10-02", "Expense", "Food", 12.5, "Coffee  shop"),
+]
+
+def test_fingerprint_ignores_description_case_and_spacing():
+    from src.database.db_manager import transaction_fingerprint
+    assert (transaction_fingerprint("2023-10-02", "Expense", "Food", 12.5, "Coffee  shop")
+            == transaction_fingerprint("2023-10-02", "Expense", "Food", 12.50, " coffee shop"))
+    assert (transaction_fingerprint("2023-10-02", "Expense", "Food", 12.5, "Coffee shop")
+            != transaction_fingerprint("2023-10-02", "Expense", "Food", 12.6, "Coffee shop"))
+
+def test_bulk_import_duplicate_modes(db):
+    assert db.add_transactions(STATEMENT) == 2
+    assert db.add_transactions(STATEMENT + [("2023-10-03", "Expense", "Food", 5.0, "")], on_duplicate="skip") == 1
+    assert len(db.get_transactions()) == 3
+
+    assert db.add_transactions([("2023-10-02", "Expense", "Food", 12.5, "COFFEE SHOP")], on_duplicate="merge") == 0
+    assert [r[5] for r in db.get_transactions() if r[1] == "2023-10-02"] == ["COFFEE SHOP"]
+
+    assert db.add_transactions(STATEMENT, on_duplicate="flag") == 2
+    report = db.find_duplicates()
+    assert len(report) == 2
+    assert all(len(row[6]) == 1 for row in report)
+
+def test_single_insert_duplicates_and_promotion(db):
+    first = db.add_transaction(*STATEMENT[1])
+    assert db.add_transaction(*STATEMENT[1], on_duplicate="skip") == first
+    second = db.add_transaction(*STATEMENT[1])
+    third = db.add_transaction(*STATEMENT[1])
+    assert db.find_duplicates()[0][0] == first
+    assert db.find_duplicates()[0][6] == [second, third]
+
+    # Removing the original promotes the oldest duplicate
+    db.delete_transaction(first)
+    assert [(r[0], r[6]) for r in db.find_duplicates()] == [(second, [third])]
+
+    # Editing a duplicate into a distinct row clears its flag
+    db.update_transaction(third, "2023-10-02", "Expense", "Food", 20.0, "Coffee shop")
+    assert db.find_duplicates() == []
+    db.update_transaction(third, "2023-10-02", "Expense", "Food", 12.5, "coffee shop")
+    assert [(r[0], r[6]) for r in db.find_duplicates()] == [(second, [third])]
+
+def test_fingerprints_added_to_existing_ledger(tmp_path):
+    import sqlite3
+    db_name = str(tmp_path / "old.db")
+    conn = sqlite3.connect(db_name)
+    conn.execute("CREATE TABLE transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL, "
+                 "type TEXT NOT NULL, category TEXT NOT NULL, amount REAL NOT NULL, description TEXT)")
+    conn.executemany("INSERT INTO transactions (date, type, category, amount, description) VALUES (?, ?, ?, ?, ?)",
+                     STATEMENT + STATEMENT)
+    conn.commit()
+    conn.close()
+
+    manager = DatabaseManager(db_name)
+    assert [(r[0], r[6]) for r in manager.find_duplicates()] == [(2, [4]), (1, [3])]
+    assert manager.add_transactions(STATEMENT, on_duplicate="skip") == 0
+
+@pytest.mark.parametrize("in_memory", [False, True])
+def test_failed_write_releases_connection(tmp_path, in_memory):
+    import sqlite3
+    manager = DatabaseManager(str(tmp_path / "finance.db"), in_memory=in_memory, flush_interval=None)
+    conn = manager.get_connection()
+    for event in ("INSERT", "UPDATE"):
+        conn.execute(f"CREATE TRIGGER reject_{event.lower()} AFTER {event} ON transactions "
+                     "WHEN NEW.category = 'Bad' BEGIN SELECT RAISE(ABORT, 'rejected'); END")
+    conn.commit()
+    conn.close()
+    t_id = manager.add_transaction("2023-10-01", "Expense", "Food", 5.0)
+
+    with pytest.raises(sqlite3.IntegrityError):
+        manager.add_transaction("2023-10-02", "Expense", "Bad", 5.0)
+    with pytest.raises(sqlite3.IntegrityError):
+        manager.update_transaction(t_id, "2023-10-02", "Expense", "Bad", 5.0)
+    # The failed connections must not still hold a lock or an open transaction
+    assert manager.add_transactions([("2023-10-03", "Income", "Salary", 100.0, "")]) == 1
+    assert not manager.get_connection().in_transaction
+    assert [r.category for r in manager.get_transactions()] == ["Salary", "Food"]
+
+def test_unpadded_dates_in_existing_ledger_are_canonicalized(tmp_path):
+    import sqlite3
+    db_name = str(tmp_path / "old.db")
+    conn = sqlite3.connect(db_name)
+    conn.execute("CREATE TABLE transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL, "
+                 "type TEXT NOT NULL, category TEXT NOT NULL, amount REAL NOT NULL, description TEXT)")
+    conn.executemany("INSERT INTO transactions (date, type, category, amount, description) VALUES (?, ?, ?, ?, ?)", [
+        ("2023-01-05", "Expense", "Food", 10.0, "Lunch"),
+        ("2023-1-5", "Expense", "Food", 10.0, "Lunch"),
+        ("2023-2-1", "Income", "Salary", 100.0, ""),
+    ])
+    conn.commit()
+    conn.close()
+
+    manager = DatabaseManager(db_name)
+    assert [r.date for r in manager.get_transactions()] == ["2023-02-01", "2023-01-05", "2023-01-05"]
+    assert [(r[0], r[6]) for r in manager.find_duplicates()] == [(1, [2])]
+    manager.set_budget("Food", "2023-01", 50.0)
+    assert manager.get_budgets("2023-01") == [("Food", 50.0, 20.0)]
+
+def test_transactions_are_typed_records(db):
+    from src.database.models import Transaction
+    t_id = db.add_transaction("2023-10-01", "Expense", "Food", 12.5, "Lunch")
+    record = db.get_transactions()[0]
+    assert isinstance(record, Transaction)
+    assert (record.id, record.amount, record.description) == (t_id, 12.5, "Lunch")
+    assert record == (t_id, "2023-10-01", "Expense", "Food", 12.5, "Lunch")
+    assert not hasattr(record, "__dict__")
+
+    with_balance = db.get_transactions_with_balance()[0]
+    assert with_balance.balance == -12.5
+    assert len(with_balance) == 7
+    assert with_balance.to_dict()["balance"] == -12.5
+
+def test_records_index_iterate_and_hash_like_tuples():
+    from src.database.models import Transaction
+    record = Transaction(1, "2023-10-01", "Expense", "Food", 12.5, "Lunch")
+    row = (1, "2023-10-01", "Expense", "Food", 12.5, "Lunch")
+    assert [record[i] for i in range(-6, 6)] == list(row + row)
+    assert record[1:4] == row[1:4]
+    assert tuple(record) == row
+    with pytest.raises(IndexError):
+        record[6]
+    id_, date, *_ = record
+    assert (id_, date) == (1, "2023-10-01")
+
+    with_balance = Transaction(*row, balance=-12.5)
+    assert with_balance[-1] == with_balance[6] == -12.5
+    assert {record, Transaction(*row), with_balance} == {record, with_balance}
+    assert hash(record) == hash(row)
+
+def test_balance_read_does_not_dirty_working_copy(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "finance.db"), in_memory=True, flush_interval=None)
+    manager.add_transactions([
+        ("2023-09-01", "Income", "Salary", 1000.0, ""),
+        ("2023-10-01", "Expense", "Food", 10.0, ""),
+    ])
+    manager.get_transactions_with_balance("2023-10-01", "2023-10-31")
+    manager.flush()
+    manager.get_transactions_with_balance("2023-10-01", "2023-10-31")
+    assert manager._dirty is False
+    assert manager.flush() is False
+    manager.close()
+
+def test_spending_backfill_runs_once(tmp_path):
+    db_name = str(tmp_path / "finance.db")
+    manager = DatabaseManager(db_name)
+    conn = manager.get_connection()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 2
+    # Simulate an expense written without the trigger: a second start must not rescan
+    conn.execute("DROP TRIGGER trg_spending_insert")
+    conn.execute("INSERT INTO transactions (date, type, category, amount, fingerprint) "
+                 "VALUES ('2023-10-01', 'Expense', 'Food', 5.0, 'x')")
+    conn.commit()
+    conn.close()
+
+    manager = DatabaseManager(db_name)
+    manager.set_budget("Food", "2023-10", 10.0)
+    assert manager.get_budgets("2023-10") == [("Food", 10.0, 0.0)]
+
+def test_writes_succeed_while_batches_are_half_read(db):
+    db.add_transactions([(f"2023-10-{d:02d}", "Expense", "Food", float(d), "") for d in range(1, 29)])
+    batches = db.iter_transaction_batches(batch_size=10)
+    assert [r.date for r in next(batches)][0] == "2023-10-28"
+
+    db.add_transaction("2023-09-01", "Income", "Salary", 100.0)
+    rest = [r for rows in batches for r in rows]
+    assert len(rest) == 19
+    assert rest[-1].date == "2023-09-01"
@@ -0,0 +1,36 @@
+import json
+from src.ui.profiler import RefreshProfiler, percentile
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile([7.0], 95) == 7.0
+
+def test_disabled_profiler_records_nothing():
+    profiler = RefreshProfiler()
+    with profiler.stage("refresh"):
+        profiler.count("rows", 10)
+    assert profiler.stats() == {}
+    assert profiler.chrome_trace()["traceEvents"] == []
+
+def test_nested_stages_and_trace(tmp_path):
+    profiler = RefreshProfiler(history=2, enabled=True)
+    for rows in (3, 5, 7):
+        with profiler.stage("refresh"):
+            with profiler.stage("sql"):
+                pass
+            profiler.count("rows", rows)
+
+    stats = profiler.stats()
+    assert set(stats) == {"refresh", "sql"}
+    assert stats["refresh"]["samples"] == 2
+    assert stats["refresh"]["p50"] >= stats["sql"]["p50"]
+    assert profiler.last_counters() == {"rows": 7}
+
+    path = tmp_path / "trace.json"
+    profiler.dump_trace(str(path))
+    events = json.loads(path.read_text())["traceEvents"]
+    assert [e["name"] for e in events] == ["sql", "refresh", "sql", "refresh"]
+    assert events[-1]["args"] == {"rows": 7}
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)